@@ -0,0 +1,67 @@
+"""Cold-start cost of a new server process with an empty vs a populated disk cache.
+
+Each sample runs the warm-up -- every dataset plus each country's default
+pyramids and growth chart, see ``panpop.warmup`` -- in a fresh interpreter
+whose ``PANPOP_DISK_CACHE`` points at a temporary directory. The first
+process finds it empty and fills it; the following ones are served from it,
+as a restarted or second server on the host would be::
+
+    python benchmarks/bench_disk_cache.py [--rounds 3]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import json
+from panpop.cache import disk_cache
+from panpop.warmup import warmup
+warmup.run(1)
+print(json.dumps({"seconds": warmup.elapsed, "failed": warmup.failed, "disk": disk_cache.stats()}))
+"""
+
+
+def cold_start(directory):
+    env = dict(os.environ, PYTHONPATH=str(ROOT), PANPOP_DISK_CACHE=str(directory))
+    child = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if child.returncode:
+        sys.exit(f"warm-up failed:\n{child.stderr}")
+    result = json.loads(child.stdout.splitlines()[-1])
+    if result["failed"]:
+        sys.exit(f"{result['failed']} warm-up tasks failed")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        empty = cold_start(directory)
+        warm = [cold_start(directory) for _ in range(args.rounds)]
+
+    disk = empty["disk"]
+    print(
+        f"{'empty':<10}{empty['seconds'] * 1e3:>10.1f} ms  "
+        f"wrote {disk['writes']} entries, {disk['bytes'] / 1e6:.1f} MB"
+    )
+    seconds = statistics.median(result["seconds"] for result in warm)
+    print(
+        f"{'populated':<10}{seconds * 1e3:>10.1f} ms  ({empty['seconds'] / seconds:.1f}x, "
+        f"{warm[-1]['disk']['hits']} hits, {warm[-1]['disk']['misses']} misses)"
+    )
+
+
+if __name__ == "__main__":
+    main()
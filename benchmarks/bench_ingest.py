@@ -0,0 +1,116 @@
+"""Peak memory of ``python -m panpop.ingest`` as the source file grows.
+
+A synthetic long-format source is written from the pyramid workbooks: each
+country's five-year groups are spread over single-year ages, and
+``--countries`` countries are made by scaling the six featured ones. Each
+size repeats that source ``copies`` times, so the input grows while the
+catalogue it produces does not; every size is ingested in its own process
+into a temporary catalogue, and a bounded ingestion shows a flat peak RSS::
+
+    python benchmarks/bench_ingest.py [--countries 50] [--copies 1 4 16] [--chunksize 500000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from panpop.countries import COUNTRIES  # noqa: E402
+from panpop.data import load_dataset  # noqa: E402
+
+
+def single_ages(df):
+    """Long-format rows of a pyramid frame, groups split evenly over single years."""
+    rows = []
+    for sex, column in [("Male", "Male Population"), ("Female", "Female Population")]:
+        for offset in range(5):
+            groups = df["Age Group"].astype(str)
+            open_ended = groups == "100+"
+            if offset:
+                groups, counts = groups[~open_ended], df[column][~open_ended] / 5
+            else:
+                counts = np.where(open_ended, df[column], df[column] / 5)
+            ages = groups.map(
+                lambda group: group if group == "100+" else int(group.split("-")[0]) + offset
+            )
+            rows.append(
+                pd.DataFrame(
+                    {"year": df["Year"][ages.index], "age": ages, "sex": sex, "population": counts}
+                )
+            )
+    return pd.concat(rows)
+
+
+def source_text(n_countries):
+    bases = [single_ages(load_dataset(country.pyramid_dataset)) for country in COUNTRIES.values()]
+    scales = np.random.default_rng(0).uniform(0.05, 2, n_countries)
+    frames = [
+        bases[i % len(bases)].assign(
+            country=f"Country {i:03d}", population=bases[i % len(bases)]["population"] * scale
+        )
+        for i, scale in enumerate(scales)
+    ]
+    df = pd.concat(frames)[["country", "year", "age", "sex", "population"]]
+    header, body = df.to_csv(index=False, float_format="%.1f").split("\n", 1)
+    return header + "\n", body
+
+
+CHILD = """
+import json, sys
+from panpop.ingest import ingest
+entries, stats = ingest(sys.argv[1], chunksize=int(sys.argv[2]))
+print(json.dumps(dict(stats, countries=len(entries))))
+"""
+
+
+def ingest(source, catalogue_dir, chunksize):
+    env = dict(os.environ, PYTHONPATH=str(ROOT), PANPOP_CATALOGUE_DIR=str(catalogue_dir))
+    child = subprocess.run(
+        [sys.executable, "-c", CHILD, str(source), str(chunksize)],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if child.returncode:
+        sys.exit(f"ingestion failed:\n{child.stderr}")
+    return json.loads(child.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--countries", type=int, default=50)
+    parser.add_argument("--copies", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    args = parser.parse_args(argv)
+
+    header, body = source_text(args.countries)
+    with tempfile.TemporaryDirectory() as directory:
+        source = Path(directory) / "source.csv"
+        for copies in args.copies:
+            with open(source, "w") as f:
+                f.write(header)
+                for _ in range(copies):
+                    f.write(body)
+            start = time.perf_counter()
+            stats = ingest(source, Path(directory) / f"catalogue-{copies}", args.chunksize)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{stats['rows']:>12,} rows {source.stat().st_size / 1e6:>8.0f} MB  "
+                f"{stats['chunks']:>4} chunks  {stats['countries']} countries  "
+                f"{elapsed:>6.1f}s  peak RSS {stats['peak_rss_mb']:>6.0f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
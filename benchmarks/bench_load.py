@@ -0,0 +1,57 @@
+"""Compare load time of the Excel workbooks against their Parquet artifacts.
+
+Run from the repository root after ``python -m panpop.compile``::
+
+    python benchmarks/bench_load.py [--repeat 5]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from panpop import data  # noqa: E402
+
+
+def timed(fn, name, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(name)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    manifest = data.read_manifest()
+    names = data.dataset_names()
+    missing = [name for name in names if not data.is_fresh(name, manifest)]
+    if missing:
+        sys.exit(f"stale or missing artifacts, run `python -m panpop.compile`: {missing}")
+
+    print(f"{'dataset':<28}{'excel ms':>12}{'parquet ms':>12}{'speedup':>10}")
+    excel_total = parquet_total = 0.0
+    for name in names:
+        excel = statistics.median(timed(data.read_excel, name, args.repeat))
+        parquet = statistics.median(timed(data.read_compiled, name, args.repeat))
+        excel_total += excel
+        parquet_total += parquet
+        print(
+            f"{name:<28}{excel * 1e3:>12.2f}{parquet * 1e3:>12.2f}"
+            f"{excel / parquet:>9.1f}x"
+        )
+    print(
+        f"{'all ' + str(len(names)) + ' workbooks':<28}{excel_total * 1e3:>12.2f}"
+        f"{parquet_total * 1e3:>12.2f}{excel_total / parquet_total:>9.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
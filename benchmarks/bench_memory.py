@@ -0,0 +1,31 @@
+"""Report the in-memory footprint of every dataset before and after ``compact``.
+
+    python benchmarks/bench_memory.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from panpop.data import compact, dataset_names, memory_footprint, read_dataset  # noqa: E402
+
+
+def main():
+    print(f"{'dataset':<28}{'loaded KB':>12}{'compact KB':>12}{'ratio':>8}")
+    before_total = after_total = 0
+    for name in dataset_names():
+        df = read_dataset(name)
+        before = memory_footprint(df)
+        after = memory_footprint(compact(df))
+        before_total += before
+        after_total += after
+        print(f"{name:<28}{before / 1024:>12.1f}{after / 1024:>12.1f}{before / after:>7.1f}x")
+    print(
+        f"{'total':<28}{before_total / 1024:>12.1f}{after_total / 1024:>12.1f}"
+        f"{before_total / after_total:>7.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Rerun-latency benchmark for every page of the app.
+
+Each page runs headlessly with Streamlit's AppTest in its own subprocess, so
+the cold start includes imports and empty process caches; the disk cache is
+turned off (``PANPOP_DISK_CACHE=off``) so it does not carry figures and
+frames over from earlier runs. Country pages then sweep the year slider
+across 1950-2020; other pages rerun ``--reruns`` times.
+Per page it records cold start, warm-rerun p50/p95 and peak RSS, and writes
+the results as sorted JSON so runs from two commits can be diffed::
+
+    python benchmarks/bench_pages.py [--output bench_pages.json] [--reruns 20]
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PAGES = ["HOME.py"] + sorted(str(path.relative_to(ROOT)) for path in ROOT.glob("pages/*.py"))
+YEARS = range(1950, 2021)
+
+
+def percentile(samples, q):
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1]
+
+
+def measure_page(page, reruns):
+    sys.path.insert(0, str(ROOT))
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(ROOT / page), default_timeout=120)
+    start = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"{page} raised: {at.exception[0].value}")
+
+    warm = []
+    if at.slider:
+        for year in list(YEARS[1:]) + [YEARS[0]]:
+            at.slider[0].set_value(year)
+            start = time.perf_counter()
+            at.run()
+            warm.append(time.perf_counter() - start)
+    else:
+        for _ in range(reruns):
+            start = time.perf_counter()
+            at.run()
+            warm.append(time.perf_counter() - start)
+
+    return {
+        "cold_start_ms": round(cold * 1e3, 1),
+        "warm_reruns": len(warm),
+        "warm_p50_ms": round(percentile(warm, 50) * 1e3, 1),
+        "warm_p95_ms": round(percentile(warm, 95) * 1e3, 1),
+        # ru_maxrss is reported in kilobytes on Linux.
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="bench_pages.json")
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--page", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.page:
+        # Child process: measure one page and report it on stdout.
+        print(json.dumps(measure_page(args.page, args.reruns)))
+        return
+
+    results = {}
+    for page in PAGES:
+        child = subprocess.run(
+            [sys.executable, __file__, "--page", page, "--reruns", str(args.reruns)],
+            cwd=ROOT,
+            env=dict(os.environ, PANPOP_DISK_CACHE="off"),
+            capture_output=True,
+            text=True,
+        )
+        if child.returncode:
+            sys.exit(f"{page} failed:\n{child.stderr}")
+        results[page] = json.loads(child.stdout.strip().splitlines()[-1])
+        row = results[page]
+        print(
+            f"{page:<32}cold {row['cold_start_ms']:>8.1f} ms  "
+            f"p50 {row['warm_p50_ms']:>7.1f} ms  p95 {row['warm_p95_ms']:>7.1f} ms  "
+            f"rss {row['peak_rss_mb']:>6.1f} MB"
+        )
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pages": results,
+    }
+    with open(ROOT / args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
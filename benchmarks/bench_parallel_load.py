@@ -0,0 +1,77 @@
+"""Wall-clock time to cold-load every workbook in ``data/``: serial vs pools.
+
+Each round clears ``data_cache`` and loads all datasets with
+``load_datasets``, serially and through a thread and a process pool. The
+pools are created once and primed beforehand, as a server would keep them,
+so their startup cost is reported separately. ``--source excel`` parses the
+workbooks (the CPU-bound case the process pool is for); ``--source dataset``
+reads the compiled Parquet artifacts where they are fresh. The on-disk cache
+is bypassed, since it would serve every round after the first::
+
+    python benchmarks/bench_parallel_load.py [--source excel] [--workers 4] [--rounds 3]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from panpop import data  # noqa: E402
+from panpop.cache import data_cache, disk_cache  # noqa: E402
+
+READERS = {"excel": data.read_excel, "dataset": data.read_dataset}
+
+
+def serial(names, reader):
+    for name in names:
+        data_cache.get(
+            data.source_path(name), lambda: data.compact(reader(name)), tag=data.cache_tag(name)
+        )
+
+
+def cold_load(load, names, rounds):
+    samples = []
+    for _ in range(rounds):
+        data_cache.clear()
+        start = time.perf_counter()
+        load(names)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", choices=READERS, default="excel")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    disk_cache.enabled = False
+    names = data.dataset_names()
+    reader = READERS[args.source]
+    print(f"{len(names)} datasets from {args.source}, {args.workers} workers, {os.cpu_count()} CPUs")
+
+    baseline = cold_load(lambda names: serial(names, reader), names, args.rounds)
+    print(f"{'serial':<10}{baseline * 1e3:>10.1f} ms")
+    for kind in ["thread", "process"]:
+        start = time.perf_counter()
+        pool = data.make_executor(kind, args.workers)
+        # Start every worker, and import pandas in the worker processes.
+        list(pool.map(data.source_path, names))
+        startup = time.perf_counter() - start
+        with pool:
+            elapsed = cold_load(
+                lambda names: list(data.load_datasets(names, pool, reader)), names, args.rounds
+            )
+        print(
+            f"{kind:<10}{elapsed * 1e3:>10.1f} ms  ({baseline / elapsed:.1f}x, "
+            f"pool startup {startup * 1e3:.0f} ms)"
+        )
+
+
+if __name__ == "__main__":
+    main()
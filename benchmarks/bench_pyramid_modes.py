@@ -0,0 +1,60 @@
+"""Compare the server-slider and in-browser animated pyramid modes.
+
+Drives a country page headlessly with Streamlit's AppTest, scrubs through every
+year in server-slider mode and loads the animated mode once, then reports the
+number of script reruns and the bytes of Plotly figure JSON sent per mode::
+
+    python benchmarks/bench_pyramid_modes.py [--page pages/1_USA.py]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+YEARS = range(1950, 2021)
+
+
+def pyramid_bytes(at):
+    # The pyramid is the first chart on the page; the growth chart follows.
+    return len(at.get("plotly_chart")[0].proto.spec)
+
+
+def server_mode(page):
+    at = AppTest.from_file(page, default_timeout=60).run()
+    reruns, payload = 1, pyramid_bytes(at)
+    start = time.perf_counter()
+    for year in YEARS[1:]:
+        at.slider[0].set_value(year).run()
+        reruns += 1
+        payload += pyramid_bytes(at)
+    return reruns, payload, time.perf_counter() - start
+
+
+def animated_mode(page):
+    at = AppTest.from_file(page, default_timeout=60).run()
+    start = time.perf_counter()
+    at.toggle[0].set_value(True).run()
+    # Every later year change happens in the browser without a rerun.
+    return 2, pyramid_bytes(at), time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page", default="pages/1_USA.py")
+    args = parser.parse_args(argv)
+
+    print(f"{args.page}: viewing all {len(YEARS)} years")
+    print(f"{'mode':<12}{'reruns':>8}{'figure KB':>12}{'server s':>10}")
+    for label, mode in [("server", server_mode), ("animated", animated_mode)]:
+        reruns, payload, elapsed = mode(str(ROOT / args.page))
+        print(f"{label:<12}{reruns:>8}{payload / 1024:>12.1f}{elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Compare per-year pyramid lookup latency: boolean masks vs ``PyramidIndex``.
+
+The mask variant is what the pages used to do on every rerun: one
+``df["Year"] == year`` comparison and three filtered column copies::
+
+    python benchmarks/bench_year_lookup.py [--dataset USA-1950-2020] [--rounds 20]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from panpop.data import load_dataset  # noqa: E402
+from panpop.pyramid import PyramidIndex  # noqa: E402
+
+
+def mask_lookup(df, year):
+    yr = df["Year"] == year
+    return df[yr]["Age Group"], df[yr]["Male Population"], df[yr]["Female Population"]
+
+
+def per_call(fn, years, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter_ns()
+        for year in years:
+            fn(year)
+        samples.append((time.perf_counter_ns() - start) / len(years))
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", default="USA-1950-2020")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    df = load_dataset(args.dataset)
+    start = time.perf_counter_ns()
+    index = PyramidIndex.from_frame(df)
+    build = time.perf_counter_ns() - start
+    years = [int(year) for year in index.years]
+
+    mask = per_call(lambda year: mask_lookup(df, year), years, args.rounds)
+    lookup = per_call(index.year, years, args.rounds)
+    print(f"{args.dataset}: {len(years)} years, {len(index.ages)} age groups")
+    print(f"index build (once)   {build / 1e3:10.1f} us")
+    print(f"boolean mask lookup  {mask / 1e3:10.2f} us/year")
+    print(f"PyramidIndex.year    {lookup / 1e3:10.2f} us/year  ({mask / lookup:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Check that moving the year slider reruns only the pyramid fragment.
+
+AppTest always performs full script runs, so this harness swaps in a script
+runner that keeps its fragment storage between runs and can replay a single
+fragment, the way the Streamlit server does when a widget inside a fragment
+changes. It counts calls into each page section and times a full rerun
+against a fragment rerun; the exit status is non-zero if a year change
+executes anything outside the pyramid section::
+
+    python benchmarks/check_fragment_reruns.py [--page pages/1_USA.py]
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from functools import wraps
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from streamlit.runtime.fragment import MemoryFragmentStorage  # noqa: E402
+from streamlit.runtime.scriptrunner import RerunData  # noqa: E402
+from streamlit.testing.v1 import app_test  # noqa: E402
+from streamlit.testing.v1.local_script_runner import (  # noqa: E402
+    LocalScriptRunner,
+    require_widgets_deltas,
+)
+from streamlit.testing.v1.element_tree import parse_tree_from_messages  # noqa: E402
+
+from panpop import figures, page  # noqa: E402
+from panpop.cache import disk_cache  # noqa: E402
+
+SECTIONS = [
+    (figures, "pyramid_figure"),
+    (page, "growth_section"),
+    (page, "data_section"),
+    (page, "explore"),
+]
+
+fragment_storage = MemoryFragmentStorage()
+fragment_queue = []
+calls = Counter()
+
+
+class FragmentScriptRunner(LocalScriptRunner):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._fragment_storage = fragment_storage
+
+    def run(self, widget_state=None, query_params=None, timeout=3, page_hash=""):
+        self.request_rerun(
+            RerunData(
+                widget_states=widget_state,
+                page_script_hash=page_hash,
+                fragment_id_queue=list(fragment_queue),
+                is_fragment_scoped_rerun=bool(fragment_queue),
+            )
+        )
+        if not self._script_thread:
+            self.start()
+        require_widgets_deltas(self, timeout)
+        return parse_tree_from_messages(self.forward_msgs())
+
+
+def counted(name, fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        calls[name] += 1
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def timed_run(at):
+    calls.clear()
+    start = time.perf_counter()
+    at.run()
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page", default="pages/1_USA.py")
+    args = parser.parse_args(argv)
+
+    # Figures served from disk would not be counted as built.
+    disk_cache.enabled = False
+    app_test.LocalScriptRunner = FragmentScriptRunner
+    for module, name in SECTIONS:
+        setattr(module, name, counted(name, getattr(module, name)))
+
+    at = app_test.AppTest.from_file(str(ROOT / args.page), default_timeout=60)
+    at.run()
+    at.slider[0].set_value(1960)
+    full = timed_run(at)
+    full_calls = dict(calls)
+
+    # The slider is the first widget on the page, so the pyramid fragment is
+    # the first one registered.
+    fragment_queue.append(next(iter(fragment_storage._fragments)))
+    at.slider[0].set_value(1990)
+    fragment = timed_run(at)
+    fragment_calls = dict(calls)
+
+    print(f"full rerun      {full * 1e3:8.1f} ms  {full_calls}")
+    print(f"fragment rerun  {fragment * 1e3:8.1f} ms  {fragment_calls}")
+    if fragment_calls != {"pyramid_figure": 1}:
+        sys.exit("year change executed sections outside the pyramid fragment")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Check the derived growth series against the published growth workbooks.
+
+The pages sum their growth series and the comparison table from the pyramid
+datasets (see ``panpop.growth``). This compares each with the workbook it
+replaced -- ``<Country>-Growth-1950-2020`` and ``6-Growth-1950-2020`` -- and
+reports every year that is missing on either side or differs by more than
+``--tolerance`` people; the exit status is non-zero if any does::
+
+    python benchmarks/check_growth.py [--tolerance 0]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from panpop.countries import COUNTRIES  # noqa: E402
+from panpop.data import load_dataset  # noqa: E402
+from panpop.growth import load_comparison, load_growth  # noqa: E402
+
+COMPARISON_DATASET = "6-Growth-1950-2020"
+
+
+def divergence(derived, published, keys, tolerance):
+    """Rows of ``keys`` + populations where the two frames disagree."""
+    merged = pd.merge(
+        derived.astype({"Population": "int64"}),
+        published.astype({"Population": "int64"}),
+        on=keys,
+        how="outer",
+        suffixes=(" derived", " published"),
+        indicator=True,
+    )
+    difference = (merged["Population derived"] - merged["Population published"]).abs()
+    return merged[(merged["_merge"] != "both") | (difference > tolerance)].drop(columns="_merge")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tolerance", type=int, default=0, help="allowed difference in people")
+    args = parser.parse_args(argv)
+
+    checks = [
+        (country.growth_dataset, load_growth(country), load_dataset(country.growth_dataset), ["Year"])
+        for country in COUNTRIES.values()
+    ]
+    checks.append(
+        (
+            COMPARISON_DATASET,
+            load_comparison().astype({"Country": str}),
+            load_dataset(COMPARISON_DATASET).astype({"Country": str}),
+            ["Country", "Year"],
+        )
+    )
+
+    diverged = []
+    for name, derived, published, keys in checks:
+        rows = divergence(derived, published, keys, args.tolerance)
+        print(f"{name:<28}{len(derived):>6} rows  {'ok' if rows.empty else f'{len(rows)} diverge'}")
+        if not rows.empty:
+            print(rows.to_string(index=False))
+            diverged.append(name)
+
+    if diverged:
+        sys.exit(f"derived growth diverges from: {', '.join(diverged)}")
+
+
+if __name__ == "__main__":
+    main()
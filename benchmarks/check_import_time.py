@@ -0,0 +1,92 @@
+"""Fail when importing a page's modules exceeds its import-time budget.
+
+For every page, the module-level imports of the script are run in a fresh
+interpreter under ``python -X importtime`` after the modules listed as
+``baseline`` in ``import_budget.json``: Streamlit, which the server has
+already loaded, and pandas, which every page needs for its data. The cost of
+the page is the cumulative time of the top-level imports that follow, median
+over ``--runs`` processes. Imports deferred into the section that uses them
+are not counted, which is the point::
+
+    python benchmarks/check_import_time.py [--runs 5] [--budget benchmarks/import_budget.json]
+"""
+
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PAGES = ["HOME.py"] + sorted(str(path.relative_to(ROOT)) for path in ROOT.glob("pages/*.py"))
+
+
+def module_imports(page):
+    """Source of the import statements at the top level of ``page``."""
+    source = (ROOT / page).read_text()
+    tree = ast.parse(source)
+    return [
+        ast.get_source_segment(source, node)
+        for node in tree.body
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    ]
+
+
+def import_times(code):
+    """``(module, cumulative_us)`` of each top-level import made by ``code``."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    child = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if child.returncode:
+        sys.exit(f"importing failed:\n{child.stderr}")
+    times = []
+    for line in child.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Nested imports are indented beneath the module that made them.
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            times.append((name.strip(), int(cumulative)))
+    return times
+
+
+def page_cost_ms(page, baseline):
+    code = "\n".join([f"import {module}" for module in baseline] + module_imports(page))
+    times = import_times(code)
+    loaded = [name for name, _ in times]
+    start = max(loaded.index(module) for module in baseline) + 1 if baseline else 0
+    return sum(us for _, us in times[start:]) / 1e3
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", default=str(ROOT / "benchmarks" / "import_budget.json"))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with open(args.budget) as f:
+        config = json.load(f)
+
+    over = []
+    for page in PAGES:
+        cost = statistics.median(page_cost_ms(page, config["baseline"]) for _ in range(args.runs))
+        budget = config["pages"].get(page, config["default_ms"])
+        status = "ok" if cost <= budget else "OVER"
+        print(f"{page:<32}{cost:>8.1f} ms  budget {budget:>6} ms  {status}")
+        if cost > budget:
+            over.append(page)
+
+    if over:
+        sys.exit(f"over the import-time budget: {', '.join(over)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+"""Concurrent-session load generator for the whole app.
+
+Starts the Streamlit server in this process on a free local port and drives
+``--sessions`` websocket sessions against it, exactly as browsers would: each
+session opens a country page or the comparison page and then, until
+``--duration`` runs out, picks random actions -- moving the year slider,
+changing the table filters, or preparing and fetching a download. Everything
+runs on 127.0.0.1, so no network access is needed.
+
+It reports throughput and p50/p95/p99 latency per action, and checks the
+process-wide caches for cross-session thrashing: once every session has loaded
+its page, a dataset reload, a figure or export eviction, or a shrinking
+``st.cache_data`` (as ``st.cache_data.clear()`` on every page used to cause)
+means sessions are undoing each other's work. The exit status is non-zero
+when that happens::
+
+    python benchmarks/load_sessions.py [--sessions 16] [--duration 30] [--output load_sessions.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PAGES = ["USA", "BRAZIL", "GERMANY", "KENYA", "INDIA", "JAPAN", "COUNTRY_COMPARISON"]
+ACTIONS = ["year", "filter", "download"]
+
+
+def percentile(samples, q):
+    if len(samples) < 2:
+        return samples[0] if samples else None
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def cache_snapshot():
+    from streamlit.runtime.caching.cache_data_api import _data_caches
+
+    from panpop.cache import data_cache
+    from panpop.exports import export_cache
+    from panpop.figures import figure_cache
+
+    return {
+        "data": data_cache.stats(),
+        "figures": figure_cache.stats(),
+        "exports": export_cache.stats(),
+        "st_cache_data_bytes": sum(stat.byte_length for stat in _data_caches.get_stats()),
+    }
+
+
+class Session:
+    """One simulated browser tab: a websocket plus the widgets it has been sent."""
+
+    def __init__(self, port, page, rng):
+        self.port = port
+        self.page = page
+        self.rng = rng
+        self.page_hash = ""
+        self.widgets = {}
+        self.states = {}
+        self.messages = {}
+        self.download_url = None
+
+    async def connect(self):
+        from tornado.websocket import websocket_connect
+
+        self.ws = await websocket_connect(
+            f"ws://127.0.0.1:{self.port}/_stcore/stream", subprotocols=["streamlit"]
+        )
+
+    async def rerun(self, fragment_id=""):
+        """Send a rerun with the current widget states; return its latency in seconds."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        client_state = msg.rerun_script
+        client_state.query_string = ""
+        client_state.page_name = self.page
+        client_state.page_script_hash = self.page_hash
+        client_state.fragment_id = fragment_id
+        client_state.widget_states.widgets.extend(self.states.values())
+        # Button clicks are one-shot triggers, like in the browser.
+        for widget_id, state in list(self.states.items()):
+            if state.WhichOneof("value") == "trigger_value":
+                del self.states[widget_id]
+
+        start = time.perf_counter()
+        await self.ws.write_message(msg.SerializeToString(), binary=True)
+        while True:
+            raw = await self.ws.read_message()
+            if raw is None:
+                raise ConnectionError(f"{self.page}: server closed the session")
+            fmsg = ForwardMsg()
+            fmsg.ParseFromString(raw)
+            kind = fmsg.WhichOneof("type")
+            if kind == "ref_hash":
+                # Large messages this session has already received are sent by hash.
+                fmsg = self.messages[fmsg.ref_hash]
+                kind = fmsg.WhichOneof("type")
+            elif fmsg.hash:
+                self.messages[fmsg.hash] = fmsg
+
+            if kind == "new_session":
+                self.page_hash = fmsg.new_session.page_script_hash
+            elif kind == "delta" and fmsg.delta.WhichOneof("type") == "new_element":
+                self.observe(fmsg.delta)
+            elif kind == "script_finished":
+                return time.perf_counter() - start
+
+    def observe(self, delta):
+        element = delta.new_element
+        kind = element.WhichOneof("type")
+        if kind in ("slider", "multiselect", "button", "radio"):
+            widget = getattr(element, kind)
+            self.widgets[widget.label] = (kind, widget, delta.fragment_id)
+        elif kind == "download_button":
+            self.download_url = element.download_button.url
+
+    def find(self, kind, label_prefix):
+        """All rendered widgets of ``kind`` whose label starts with ``label_prefix``."""
+        return [
+            (widget, fragment_id)
+            for label, (widget_kind, widget, fragment_id) in self.widgets.items()
+            if widget_kind == kind and label.startswith(label_prefix)
+        ]
+
+    def set_state(self, widget, field, value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        state = WidgetState(id=widget.id)
+        if field == "trigger_value":
+            state.trigger_value = value
+        else:
+            getattr(state, field).data.extend(value)
+        self.states[widget.id] = state
+
+    async def change_year(self):
+        sliders = self.find("slider", "Select a year")
+        if not sliders:
+            return None
+        slider, fragment_id = sliders[0]
+        year = self.rng.randint(int(slider.min), int(slider.max))
+        self.set_state(slider, "double_array_value", [year])
+        return await self.rerun(fragment_id)
+
+    async def change_filter(self):
+        """Filter the first table on a random column, then narrow that column's values."""
+        columns = self.find("multiselect", "Filter dataframe on")
+        if not columns:
+            return None
+        multiselect, fragment_id = columns[0]
+        column = self.rng.randrange(len(multiselect.options))
+        self.set_state(multiselect, "int_array_value", [column])
+        elapsed = await self.rerun(fragment_id)
+
+        label = f"Values for {multiselect.options[column]}"
+        for widget, fragment_id in self.find("slider", label):
+            low = self.rng.uniform(widget.min, widget.max)
+            self.set_state(widget, "double_array_value", [low, self.rng.uniform(low, widget.max)])
+            elapsed += await self.rerun(fragment_id)
+        for widget, fragment_id in self.find("multiselect", label):
+            chosen = self.rng.sample(range(len(widget.options)), k=self.rng.randint(1, len(widget.options)))
+            self.set_state(widget, "int_array_value", sorted(chosen))
+            elapsed += await self.rerun(fragment_id)
+        return elapsed
+
+    async def download(self):
+        """Press PREPARE DOWNLOAD if it is showing, then fetch the file like the browser."""
+        from tornado.httpclient import AsyncHTTPClient
+
+        start = time.perf_counter()
+        for button, fragment_id in self.find("button", "PREPARE DOWNLOAD"):
+            self.set_state(button, "trigger_value", True)
+            await self.rerun(fragment_id)
+            self.widgets = {
+                label: entry for label, entry in self.widgets.items()
+                if label != "PREPARE DOWNLOAD"
+            }
+            break
+        if self.download_url is None:
+            return None
+        response = await AsyncHTTPClient().fetch(f"http://127.0.0.1:{self.port}{self.download_url}")
+        if not response.body:
+            raise RuntimeError(f"{self.page}: empty download from {self.download_url}")
+        return time.perf_counter() - start
+
+
+async def drive(port, args, samples, snapshots):
+    from tornado.httpclient import AsyncHTTPClient
+
+    client = AsyncHTTPClient()
+    deadline = time.monotonic() + 60
+    while True:
+        try:
+            await client.fetch(f"http://127.0.0.1:{port}/_stcore/health")
+            break
+        except Exception:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+    rng = random.Random(args.seed)
+    sessions = [
+        Session(port, PAGES[i % len(PAGES)], random.Random(rng.random()))
+        for i in range(args.sessions)
+    ]
+    await asyncio.gather(*(session.connect() for session in sessions))
+
+    async def load(session):
+        samples.append((session.page, "load", await session.rerun()))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(load(session) for session in sessions))
+    snapshots.append(cache_snapshot())
+
+    stop_at = time.perf_counter() + args.duration
+
+    async def run(session):
+        while time.perf_counter() < stop_at:
+            action = session.rng.choice(ACTIONS)
+            elapsed = await getattr(
+                session, {"year": "change_year", "filter": "change_filter", "download": "download"}[action]
+            )()
+            if elapsed is not None:
+                samples.append((session.page, action, elapsed))
+            await asyncio.sleep(session.rng.uniform(0, args.think))
+
+    async def sample_caches():
+        while time.perf_counter() < stop_at:
+            await asyncio.sleep(1)
+            snapshots.append(cache_snapshot())
+
+    load_start = time.perf_counter()
+    await asyncio.gather(sample_caches(), *(run(session) for session in sessions))
+    snapshots.append(cache_snapshot())
+    for session in sessions:
+        session.ws.close()
+    return load_start - start, time.perf_counter() - load_start
+
+
+def thrashing(snapshots):
+    """Reasons the caches were churned by the load phase, if any."""
+    first, last = snapshots[0], snapshots[-1]
+    reasons = []
+    reloads = last["data"]["misses"] - first["data"]["misses"]
+    if reloads:
+        reasons.append(f"{reloads} dataset reload(s) after every page was loaded")
+    for name in ("figures", "exports"):
+        evicted = last[name]["evictions"] - first[name]["evictions"]
+        if evicted:
+            reasons.append(f"{evicted} {name} cache eviction(s)")
+    sizes = [snapshot["st_cache_data_bytes"] for snapshot in snapshots]
+    drops = sum(1 for before, after in zip(sizes, sizes[1:]) if after < before)
+    if drops:
+        reasons.append(f"st.cache_data shrank {drops} time(s)")
+    return reasons
+
+
+def summarize(samples, elapsed):
+    def row(values):
+        return {
+            "count": len(values),
+            "p50_ms": round(percentile(values, 50) * 1e3, 1),
+            "p95_ms": round(percentile(values, 95) * 1e3, 1),
+            "p99_ms": round(percentile(values, 99) * 1e3, 1),
+            "max_ms": round(max(values) * 1e3, 1),
+        }
+
+    actions = [sample for sample in samples if sample[1] != "load"]
+    summary = {
+        "throughput_per_s": round(len(actions) / elapsed, 1),
+        "actions": {},
+        "pages": {},
+    }
+    for action in ["load"] + ACTIONS:
+        values = [elapsed for _, kind, elapsed in samples if kind == action]
+        if values:
+            summary["actions"][action] = row(values)
+    for page in PAGES:
+        values = [elapsed for name, _, elapsed in actions if name == page]
+        if values:
+            summary["pages"][page] = row(values)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+    parser.add_argument("--think", type=float, default=0.2, help="max pause between actions")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="load_sessions.json")
+    args = parser.parse_args(argv)
+
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT))
+    from streamlit.runtime import Runtime
+    from streamlit.web import bootstrap
+
+    port = free_port()
+    flag_options = {
+        "server_port": port,
+        "server_address": "127.0.0.1",
+        "server_headless": True,
+        "server_fileWatcherType": "none",
+        "server_runOnSave": False,
+        "browser_gatherUsageStats": False,
+        "logger_level": "error",
+    }
+    samples, snapshots, result = [], [], {}
+
+    def client():
+        try:
+            result["elapsed"] = asyncio.run(drive(port, args, samples, snapshots))
+        except BaseException as exc:
+            result["error"] = exc
+        finally:
+            while not Runtime.exists():
+                time.sleep(0.1)
+            Runtime.instance().stop()
+
+    threading.Thread(target=client, daemon=True).start()
+    bootstrap.load_config_options(flag_options)
+    # Blocks serving the app until the client thread stops the runtime.
+    bootstrap.run("HOME.py", False, [], flag_options)
+
+    if "error" in result:
+        raise result["error"]
+    warmup, elapsed = result["elapsed"]
+    report = {
+        "sessions": args.sessions,
+        "duration_s": round(elapsed, 1),
+        "warmup_s": round(warmup, 2),
+        **summarize(samples, elapsed),
+        "caches": {"start": snapshots[0], "end": snapshots[-1]},
+        "thrashing": thrashing(snapshots),
+    }
+    with open(ROOT / args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+    print(f"{args.sessions} sessions, {report['throughput_per_s']} actions/s over {elapsed:.1f}s")
+    for action, row in report["actions"].items():
+        print(
+            f"{action:<10}n {row['count']:>5}  p50 {row['p50_ms']:>7.1f} ms  "
+            f"p95 {row['p95_ms']:>7.1f} ms  p99 {row['p99_ms']:>7.1f} ms"
+        )
+    for reason in report["thrashing"]:
+        print(f"cache thrashing: {reason}")
+    print(f"wrote {args.output}")
+    if report["thrashing"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Aggregate the section timings logged by ``panpop.timing`` across sessions.
+
+Run the app with ``PANPOP_TIMING_LOG`` set, browse (or run
+``benchmarks/load_sessions.py`` with the variable exported), then::
+
+    PANPOP_TIMING_LOG=timings.jsonl streamlit run HOME.py
+    python benchmarks/summarize_timings.py timings.jsonl [--page USA]
+
+Prints count, p50, p95 and total time per (page, section), slowest first.
+"""
+
+import argparse
+import json
+import statistics
+from collections import defaultdict
+
+
+def percentile(samples, q):
+    if len(samples) < 2:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("log")
+    parser.add_argument("--page", help="only this page, e.g. USA or COUNTRY_COMPARISON")
+    args = parser.parse_args(argv)
+
+    samples = defaultdict(list)
+    sessions = set()
+    with open(args.log) as f:
+        for line in f:
+            record = json.loads(line)
+            if args.page and record["page"] != args.page:
+                continue
+            samples[record["page"], record["section"]].append(record["ms"])
+            sessions.add(record["session"])
+
+    rows = sorted(samples.items(), key=lambda item: -sum(item[1]))
+    print(f"{len(sessions)} session(s)")
+    print(f"{'page':<20}{'section':<26}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'total s':>10}")
+    for (page, section), values in rows:
+        print(
+            f"{page or '-':<20}{section:<26}{len(values):>7}"
+            f"{percentile(values, 50):>10.1f}{percentile(values, 95):>10.1f}"
+            f"{sum(values) / 1e3:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
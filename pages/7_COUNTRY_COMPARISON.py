@@ -1,9 +1,7 @@
 import streamlit as st
-import pandas as pd
-from streamlit_extras.dataframe_explorer import dataframe_explorer
-import plotly_express as px
-from streamlit_extras.add_vertical_space import add_vertical_space
-import io
+from panpop.growth import load_comparison
+from panpop.page import add_vertical_space, debug_panel, explore, export_buttons, page_run
+from panpop.timing import timed
 
 
 def set_favicon():
@@ -11,110 +9,87 @@ def set_favicon():
     st.set_page_config(page_title="CC · PanPop", page_icon=favicon_path)
 
 
-set_favicon()
-
-
-@st.cache_data
-def get_data():
-    df = pd.read_excel("data/6-Growth-1950-2020.xlsx")
-    return df
+def local_css(file_name):
+    with open(file_name) as f:
+        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
 
 
-df = get_data()
+set_favicon()
 
+with page_run("COUNTRY_COMPARISON"):
+    df = load_comparison()
 
-def local_css(file_name):
-    with open(file_name) as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+    local_css("style/style.css")
 
+    st.markdown(
+        "<h1 style='text-align: center;'>Country Comparison</h1>",
+        unsafe_allow_html=True,
+    )
 
-local_css("style/style.css")
+    add_vertical_space(1)
 
-st.markdown(
-    "<h1 style='text-align: center;'>Country Comparison</h1>",
-    unsafe_allow_html=True,
-)
+    st.markdown(
+        "<h4>Six Countries’ Annual Population Growth Multiple-Line Graph</h4>",
+        unsafe_allow_html=True,
+    )
 
-add_vertical_space(1)
+    with timed("growth_figure", chart="comparison"):
+        import plotly_express as px
 
-st.markdown(
-    "<h4>Six Countries’ Annual Population Growth Multiple-Line Graph</h4>",
-    unsafe_allow_html=True,
-)
+        fig = px.line(
+            df,
+            x="Year",
+            y="Population",
+            title="Annual Population Growth of Six Countries (1950 – 2020)",
+            color="Country",
+            markers=True,
+            height=700,
+        )
 
-fig = px.line(
-    df,
-    x="Year",
-    y="Population",
-    title="Annual Population Growth of Six Countries (1950 – 2020)",
-    color="Country",
-    markers=True,
-    height=700,
-)
+        fig.update_layout(
+            font_family="sans-serif",
+            title_font_family="FRAGMENT",
+            title_font_size=16,
+            font=dict(family="FRAGMENT"),
+            yaxis_title="Population (Billions)",
+        )
 
-fig.update_layout(
-    font_family="sans-serif",
-    title_font_family="FRAGMENT",
-    title_font_size=16,
-    font=dict(family="FRAGMENT"),
-    yaxis_title="Population (Billions)",
-)
+    with timed("plotly_chart", chart="comparison"):
+        st.plotly_chart(fig)
 
-st.plotly_chart(fig)
+    st.markdown(
+        "<p>To exclude any of the lines in the graph, locate the graph’s legend on the right and click on any of the line names. The name on the legend slightly fades when excluded. Click on a semi-faded line name to redisplay the line.</p>",
+        unsafe_allow_html=True,
+    )
 
-st.markdown(
-    "<p>To exclude any of the lines in the graph, locate the graph’s legend on the right and click on any of the line names. The name on the legend slightly fades when excluded. Click on a semi-faded line name to redisplay the line.</p>",
-    unsafe_allow_html=True,
-)
+    add_vertical_space(1)
 
-add_vertical_space(1)
+    st.markdown(
+        "<p>Double-clicking a non-faded line name will remove all lines except the double-clicked name. Double-click any semi-faded name to include all lines back in the graph.</p>",
+        unsafe_allow_html=True,
+    )
 
-st.markdown(
-    "<p>Double-clicking a non-faded line name will remove all lines except the double-clicked name. Double-click any semi-faded name to include all lines back in the graph.</p>",
-    unsafe_allow_html=True,
-)
+    add_vertical_space(1)
 
-add_vertical_space(1)
+    st.markdown(
+        "<p>An overview of observations in the trends of the multiple-line graph is included in the left sidebar.</p>",
+        unsafe_allow_html=True,
+    )
 
-st.markdown(
-    "<p>An overview of observations in the trends of the multiple-line graph is included in the left sidebar.</p>",
-    unsafe_allow_html=True,
-)
+    add_vertical_space(1)
+    st.write("---")
+    add_vertical_space(1)
 
-add_vertical_space(1)
-st.write("---")
-add_vertical_space(1)
+    st.markdown(
+        "<h4>Six Countries’ Annual Population Growth Data (1950 – 2020)</h4>",
+        unsafe_allow_html=True,
+    )
 
-st.markdown(
-    "<h4>Six Countries’ Annual Population Growth Data (1950 – 2020)</h4>",
-    unsafe_allow_html=True,
-)
+    filtered_df = explore(df, "6-Growth-1950-2020")
 
-filtered_df = dataframe_explorer(df)
-s = filtered_df.style.format({"Year": lambda x: "{:.0f}".format(x)})
-st.dataframe(s, use_container_width=True)
-
-col1, col2, col3 = st.columns(3)
-buffer = io.BytesIO()
-
-with col1:
-    pass
-
-with col2:
-    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
-        df.to_excel(writer, sheet_name="6-Growth-1950-2020")
-        writer.close()
-        st.download_button(
-            label="DOWNLOAD DATAFRAME",
-            data=buffer,
-            file_name="6-Growth-1950-2020.xlsx",
-            mime="application/vnd.ms-excel",
-        )
-    buffer.flush()
-    buffer.close()
+    export_buttons(filtered_df, "6-Growth-1950-2020")
 
-with col3:
-    pass
+debug_panel()
 
 st.sidebar.write(
     """<h1 style="font-weight: 300">Observations</h1>
@@ -0,0 +1,3 @@
+from panpop.page import render_catalogue_page
+
+render_catalogue_page()
@@ -0,0 +1 @@
+"""Shared data and rendering helpers for the PanPop Streamlit pages."""
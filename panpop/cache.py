@@ -0,0 +1,345 @@
+"""Process-wide caches shared by every session and page.
+
+``FileCache`` holds values derived from files in ``data/``. Entries are keyed
+on the file path plus a tag naming the derived value, and are validated
+against the file's content: a changed ``(mtime, size)`` signature triggers a
+SHA-256 comparison, and the entry is only reloaded when the digest differs.
+
+``LRUCache`` holds values derived from other inputs, such as generated
+exports, and evicts the least recently used entries once their total size
+exceeds a byte budget.
+
+The caches live at module level, so they are shared by every session and
+every page served by the same Streamlit process.
+
+``DiskCache`` is a tier beneath them that survives restarts and is shared by
+every server process on the host: values are pickled to files named by a
+hash of their key and ``code_version()``, so a code or library upgrade never
+reads stale entries. Files are written atomically, a hit refreshes the
+file's mtime, and once the directory exceeds its byte budget the least
+recently used files are removed under an exclusive lock. The directory is
+``data/compiled/cache`` or ``PANPOP_DISK_CACHE`` (``off`` disables the
+tier), and its budget ``PANPOP_DISK_CACHE_BYTES``. Only point it at a
+directory as trusted as the code, since entries are unpickled.
+"""
+
+import contextlib
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from importlib.metadata import version
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: eviction is not coordinated across processes.
+    fcntl = None
+
+PACKAGE_DIR = Path(__file__).resolve().parent
+DEFAULT_DISK_DIR = PACKAGE_DIR.parent / "data" / "compiled" / "cache"
+DEFAULT_DISK_BYTES = 512 * 1024 * 1024
+
+
+def file_signature(path):
+    stat = Path(path).stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def file_digest(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+class FileCache:
+    def __init__(self):
+        self._entries = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, path, loader, tag=""):
+        """Return the cached value for ``path``, calling ``loader()`` on a miss.
+
+        ``tag`` distinguishes several values derived from the same file.
+        """
+        key = (str(Path(path).resolve()), tag)
+        with self._key_lock(key):
+            signature = file_signature(key[0])
+            entry = self._entries.get(key)
+            if entry is not None and entry["signature"] == signature:
+                return self._hit(entry)
+            digest = file_digest(key[0])
+            if entry is not None and entry["digest"] == digest:
+                # Touched but unchanged, e.g. a fresh checkout of the same file.
+                entry["signature"] = signature
+                return self._hit(entry)
+
+            with self._lock:
+                self.misses += 1
+                if entry is not None:
+                    self.invalidations += 1
+            value = loader()
+            self._entries[key] = {
+                "signature": signature,
+                "digest": digest,
+                "value": value,
+            }
+            return value
+
+    def _hit(self, entry):
+        with self._lock:
+            self.hits += 1
+        return entry["value"]
+
+    def cached(self, path, tag=""):
+        """Whether ``get`` would currently hit, judged by the file signature alone."""
+        key = (str(Path(path).resolve()), tag)
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry is not None and entry["signature"] == file_signature(key[0])
+
+    def digest(self, path):
+        """Content digest of ``path``, reused from an entry while the file is untouched."""
+        path = str(Path(path).resolve())
+        signature = file_signature(path)
+        with self._lock:
+            for (entry_path, _), entry in self._entries.items():
+                if entry_path == path and entry["signature"] == signature:
+                    return entry["digest"]
+        return file_digest(path)
+
+    def invalidate(self, path):
+        """Drop every value derived from ``path``."""
+        path = str(Path(path).resolve())
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == path]:
+                del self._entries[key]
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class LRUCache:
+    def __init__(self, max_bytes, sizeof=len):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, build):
+        """Return the cached value for ``key``, calling ``build()`` on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        value = build()
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries or size > self.max_bytes:
+                # Built concurrently by another session, or too big to keep.
+                return value
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+                self.evictions += 1
+        return value
+
+    def invalidate(self, predicate):
+        """Drop every entry whose key satisfies ``predicate``."""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                _, size = self._entries.pop(key)
+                self.nbytes -= size
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """Digest of the ``panpop`` sources and the library versions pickles depend on."""
+    digest = hashlib.sha256()
+    for path in sorted(PACKAGE_DIR.glob("*.py")):
+        digest.update(path.name.encode() + b"\0" + path.read_bytes())
+    for package in ["pandas", "numpy", "plotly"]:
+        digest.update(f"{package}={version(package)}".encode())
+    return digest.hexdigest()[:16]
+
+
+class DiskCache:
+    def __init__(self, directory, max_bytes, enabled=True):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def path(self, namespace, key):
+        name = hashlib.sha256(repr((code_version(), key)).encode()).hexdigest()
+        return self.directory / namespace / f"{name}.pkl"
+
+    def contains(self, namespace, key):
+        return self.enabled and self.path(namespace, key).exists()
+
+    def get(self, namespace, key, build):
+        """Return the value stored for ``key``, calling ``build()`` and storing it on a miss."""
+        if not self.enabled:
+            return build()
+        path = self.path(namespace, key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # Unreadable entry, e.g. from a library that changed its pickles.
+            self._count("errors")
+            with contextlib.suppress(FileNotFoundError):
+                path.unlink()
+        else:
+            self._count("hits")
+            with contextlib.suppress(FileNotFoundError):
+                os.utime(path)
+            return value
+
+        self._count("misses")
+        value = build()
+        self.put(path, value)
+        return value
+
+    def put(self, path, value):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written beside the target and renamed, so other processes only ever
+        # see complete entries.
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError:
+            self._count("errors")
+            with contextlib.suppress(FileNotFoundError):
+                tmp.unlink()
+            return
+        self._count("writes")
+        self.evict()
+
+    def entries(self):
+        """``(mtime, size, path)`` of every stored entry."""
+        found = []
+        for path in self.directory.glob("*/*.pkl"):
+            with contextlib.suppress(FileNotFoundError):
+                stat = path.stat()
+                found.append((stat.st_mtime_ns, stat.st_size, path))
+        return found
+
+    @contextlib.contextmanager
+    def _exclusive(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / ".lock", "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def evict(self):
+        """Remove least recently used entries until the budget is met."""
+        with self._exclusive():
+            entries = sorted(self.entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                with contextlib.suppress(FileNotFoundError):
+                    path.unlink()
+                    self._count("evictions")
+                total -= size
+
+    def clear(self):
+        with self._exclusive():
+            for _, _, path in self.entries():
+                with contextlib.suppress(FileNotFoundError):
+                    path.unlink()
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self):
+        entries = self.entries() if self.enabled else []
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "errors": self.errors,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+data_cache = FileCache()
+
+_disk_dir = os.environ.get("PANPOP_DISK_CACHE", str(DEFAULT_DISK_DIR))
+disk_cache = DiskCache(
+    DEFAULT_DISK_DIR if _disk_dir == "off" else _disk_dir,
+    int(os.environ.get("PANPOP_DISK_CACHE_BYTES", DEFAULT_DISK_BYTES)),
+    enabled=_disk_dir != "off",
+)
@@ -0,0 +1,146 @@
+"""Per-country partitions of the full population catalogue.
+
+``python -m panpop.ingest`` turns a long-format population file covering
+every country and region into one Parquet partition per country in
+``data/compiled/catalogue/`` (or ``PANPOP_CATALOGUE_DIR``), in the pyramid
+schema of the workbooks, plus a ``manifest.json`` naming each country and the
+digest of its partition.
+
+The catalogue page only ever loads the country a visitor selects:
+``load_partition`` reads its partition and keeps it, with its year index and
+growth series, in ``partition_cache``, an LRU bounded to
+``PANPOP_CATALOGUE_CACHE_BYTES``, so memory stays flat however many countries
+the catalogue holds. When an update rewrites the manifest, only the cached
+partitions, figures and indicators of the countries whose digest changed are
+dropped.
+"""
+
+import json
+import math
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+from panpop.cache import LRUCache, data_cache
+from panpop.countries import Country
+from panpop.data import COMPILED_DIR, compact, memory_footprint
+from panpop.figures import figure_cache
+from panpop.growth import growth_series
+from panpop.indicators import indicators_cache
+from panpop.pyramid import PyramidIndex
+from panpop.timing import timed
+
+CATALOGUE_DIR = Path(os.environ.get("PANPOP_CATALOGUE_DIR", COMPILED_DIR / "catalogue"))
+MANIFEST_PATH = CATALOGUE_DIR / "manifest.json"
+MAX_PARTITION_BYTES = int(os.environ.get("PANPOP_CATALOGUE_CACHE_BYTES", 32 * 1024 * 1024))
+
+
+def country_key(name):
+    """``"Côte d'Ivoire"`` -> ``"cote-d-ivoire"``, as in PopulationPyramid.net URLs."""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "-", ascii_name.lower()).strip("-")
+
+
+def partition_path(key):
+    return CATALOGUE_DIR / f"{key}.parquet"
+
+
+# Partition digest of each country in the last manifest read, to tell which
+# countries an update changed.
+_versions = {}
+
+
+def load_manifest():
+    manifest = json.loads(MANIFEST_PATH.read_text())
+    versions = {key: entry["sha256"] for key, entry in manifest.get("countries", {}).items()}
+    invalidate({key for key, version in _versions.items() if versions.get(key) != version})
+    _versions.clear()
+    _versions.update(versions)
+    return manifest
+
+
+def read_manifest():
+    """The manifest, reloaded whenever ``python -m panpop.ingest`` rewrites it."""
+    if not MANIFEST_PATH.exists():
+        return {}
+    return data_cache.get(MANIFEST_PATH, load_manifest)
+
+
+def invalidate(keys):
+    """Drop the cached partitions, figures and indicators of the countries ``keys``."""
+    if not keys:
+        return
+    partition_cache.invalidate(lambda key: key[0] in keys)
+    figure_cache.invalidate(lambda key: key[0] in keys)
+    indicators_cache.invalidate(lambda key: key[0] in keys)
+
+
+def countries():
+    """Manifest entry of every ingested country, by key."""
+    return read_manifest().get("countries", {})
+
+
+def axis_ticks(peak):
+    """``(tick_limit, tick_step)`` for a pyramid side reaching ``peak`` people.
+
+    Steps are whole numbers of people, at least 1, so tiny territories still
+    get ticks.
+    """
+    rough = max(peak, 1) / 4
+    magnitude = 10 ** max(math.floor(math.log10(rough)), 0)
+    step = next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= rough)
+    return max(math.ceil(peak / step), 1) * step, step
+
+
+def catalogue_country(key, entry, index, growth):
+    tick_limit, tick_step = axis_ticks(max(index.male.max(), index.female.max()))
+    return Country(
+        key=key,
+        name=entry["name"],
+        title=entry["name"],
+        slug=key,
+        tick_limit=int(tick_limit),
+        tick_step=int(tick_step),
+        growth_unit="Billions" if growth["Population"].max() >= 1e9 else "Millions",
+    )
+
+
+@dataclass(frozen=True)
+class Partition:
+    country: Country
+    version: str
+    frame: pd.DataFrame
+    index: PyramidIndex
+    growth: pd.DataFrame
+
+
+def partition_size(partition):
+    index = partition.index
+    return (
+        memory_footprint(partition.frame)
+        + memory_footprint(partition.growth)
+        + index.male.nbytes
+        + index.female.nbytes
+    )
+
+
+partition_cache = LRUCache(MAX_PARTITION_BYTES, sizeof=partition_size)
+
+
+def read_partition(key, entry):
+    with timed("load_partition", country=key):
+        df = compact(pd.read_parquet(partition_path(key)))
+        index = PyramidIndex.from_frame(df, entry["sha256"])
+        growth = growth_series(df)
+        country = catalogue_country(key, entry, index, growth)
+        return Partition(country, entry["sha256"], df, index, growth)
+
+
+def load_partition(key):
+    """The partition of ``key``, shared by every session; do not mutate it."""
+    entry = countries()[key]
+    return partition_cache.get((key, entry["sha256"]), lambda: read_partition(key, entry))
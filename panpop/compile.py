@@ -0,0 +1,104 @@
+"""Compile the Excel workbooks in ``data/`` into Parquet artifacts.
+
+Run from the repository root::
+
+    python -m panpop.compile          # rebuild stale artifacts only
+    python -m panpop.compile --force  # rebuild everything
+
+Each workbook becomes ``data/compiled/<name>.parquet`` with the explicit
+column types from ``panpop.data.SCHEMAS``, and ``data/compiled/manifest.json``
+records the source digest used to decide whether an artifact is stale. The
+memory-mapped population cube (see ``panpop.cube``) is rebuilt alongside.
+
+``python -m panpop.ingest --append`` can merge new years into the artifact of
+a featured country (see ``panpop.ingest.append_featured``). Such an artifact
+stays fresh while its workbook is unchanged; ``--force``, or a change to the
+workbook, compiles it from the workbook again and drops the appended years.
+"""
+
+import argparse
+import json
+import os
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from panpop import cube, data
+
+ARROW_TYPES = {"object": pa.string(), "int64": pa.int64()}
+
+
+def arrow_schema(dtypes):
+    return pa.schema([(column, ARROW_TYPES[dtype]) for column, dtype in dtypes.items()])
+
+
+def write_artifact(df, path, dtypes):
+    """Write ``df`` to ``path`` atomically, in ``dtypes``; return the table."""
+    table = pa.Table.from_pandas(
+        df[list(dtypes)], schema=arrow_schema(dtypes), preserve_index=False
+    )
+    tmp = path.with_suffix(".tmp.parquet")
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+    return table
+
+
+def write_manifest(entries):
+    tmp = data.MANIFEST_PATH.with_suffix(".tmp.json")
+    with open(tmp, "w") as f:
+        json.dump({"datasets": entries}, f, indent=2, sort_keys=True)
+    os.replace(tmp, data.MANIFEST_PATH)
+
+
+def compile_dataset(name):
+    df = data.read_excel(name)
+    kind, dtypes = data.schema_for(df.columns)
+    table = write_artifact(df, data.artifact_path(name), dtypes)
+    return {
+        "source": data.source_path(name).name,
+        "artifact": data.artifact_path(name).name,
+        "sha256": data.file_digest(data.source_path(name)),
+        "kind": kind,
+        "rows": table.num_rows,
+        "columns": dtypes,
+    }
+
+
+def compile_all(force=False):
+    data.COMPILED_DIR.mkdir(parents=True, exist_ok=True)
+    manifest = data.read_manifest()
+    entries = manifest.get("datasets", {})
+    built = []
+    for name in data.dataset_names():
+        if not force and data.is_fresh(name, manifest):
+            continue
+        entries[name] = compile_dataset(name)
+        built.append(name)
+    # Drop entries whose source workbook no longer exists.
+    entries = {name: entries[name] for name in data.dataset_names() if name in entries}
+    write_manifest(entries)
+    return built
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--force", action="store_true", help="rebuild artifacts even if fresh"
+    )
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    built = compile_all(force=args.force)
+    shape, left_out = cube.build_cube()
+    elapsed = time.perf_counter() - start
+    for name in built:
+        print(f"compiled {name}")
+    print(f"population cube {shape} -> {cube.CUBE_PATH.name}")
+    for name in left_out:
+        print(f"{name} left out of the cube: its years or age groups differ")
+    print(f"{len(built)} dataset(s) compiled in {elapsed:.2f}s -> {data.COMPILED_DIR}")
+
+
+if __name__ == "__main__":
+    main()
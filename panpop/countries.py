@@ -0,0 +1,175 @@
+"""Registry of the countries featured in PanPop.
+
+Each country page, the home page grid and the shared figure builders read
+their per-country settings from ``COUNTRIES``; adding a featured country
+means adding an entry here plus a thin page script in ``pages/``. Every other
+country is served by the catalogue page from ingested partitions.
+"""
+
+from dataclasses import dataclass
+
+CATALOGUE_PAGE = "CATALOGUE"
+# Pyramid x-axis units, largest first: (people per unit, tick suffix, name).
+TICK_UNITS = [(1_000_000, "M", "Millions"), (1_000, "K", "Thousands"), (1, "", "People")]
+
+
+@dataclass(frozen=True)
+class Country:
+    key: str
+    name: str
+    title: str
+    slug: str
+    # Pyramid x-axis: ticks every ``tick_step`` people out to ``tick_limit``.
+    tick_limit: int
+    tick_step: int
+    growth_height: int = None
+    growth_unit: str = "Millions"
+    # Only the featured countries below have workbooks, a page of their own
+    # and a place on the home page; catalogue countries (``panpop.catalogue``)
+    # leave these unset.
+    pyramid_dataset: str = None
+    growth_dataset: str = None
+    dtm_stage: str = None
+    capital: str = None
+    capital_lat: float = None
+    capital_lon: float = None
+    map_lat: float = None
+    map_lon: float = None
+    map_zoom: float = None
+
+    @property
+    def featured(self):
+        return self.pyramid_dataset is not None
+
+    @property
+    def page(self):
+        """Page name for timings and metrics, shared by all catalogue countries."""
+        return self.key.upper() if self.featured else CATALOGUE_PAGE
+
+    def source_url(self, year=None):
+        if year is None:
+            return f"https://www.populationpyramid.net/{self.slug}/"
+        return f"https://www.populationpyramid.net/{self.slug}/{year}/"
+
+    def tick_unit(self):
+        """The largest of ``TICK_UNITS`` that ``tick_limit`` reaches."""
+        return next((unit for unit in TICK_UNITS if self.tick_limit >= unit[0]), TICK_UNITS[-1])
+
+    def ticks(self):
+        """Symmetric pyramid ticks, labelled in ``tick_unit`` with a bare 0 centre."""
+        size, suffix, _ = self.tick_unit()
+        count = self.tick_limit // self.tick_step
+        tickvals = [step * self.tick_step for step in range(-count, count + 1)]
+        ticktext = [f"{abs(val) / size:g}{suffix}" if val else 0 for val in tickvals]
+        return tickvals, ticktext
+
+
+COUNTRIES = {
+    country.key: country
+    for country in [
+        Country(
+            key="USA",
+            name="USA",
+            title="United States of America",
+            pyramid_dataset="USA-1950-2020",
+            growth_dataset="USA-Growth-1950-2020",
+            slug="united-states-of-america",
+            dtm_stage="Stage 4 – Low Stationary",
+            tick_limit=12000000,
+            tick_step=3000000,
+            capital="Washington D.C., USA",
+            capital_lat=38.9072,
+            capital_lon=-77.0369,
+            map_lat=40,
+            map_lon=-96,
+            map_zoom=2,
+            growth_height=500,
+        ),
+        Country(
+            key="Brazil",
+            name="Brazil",
+            title="Brazil",
+            pyramid_dataset="Brazil-1950-2020",
+            growth_dataset="Brazil-Growth-1950-2020",
+            slug="brazil",
+            dtm_stage="Stage 4 – Low Stationary",
+            tick_limit=10000000,
+            tick_step=2000000,
+            capital="Brasília, Brazil",
+            capital_lat=-15.7975,
+            capital_lon=-47.8919,
+            map_lat=-16,
+            map_lon=-54,
+            map_zoom=2.55,
+        ),
+        Country(
+            key="Germany",
+            name="Germany",
+            title="Germany",
+            pyramid_dataset="Germany-1950-2020",
+            growth_dataset="Germany-Growth-1950-2020",
+            slug="germany",
+            dtm_stage="Stage 5 – Declining",
+            tick_limit=4000000,
+            tick_step=1000000,
+            capital="Berlin, Germany",
+            capital_lat=52.5200,
+            capital_lon=13.4050,
+            map_lat=51.3,
+            map_lon=10,
+            map_zoom=4.2,
+        ),
+        Country(
+            key="Kenya",
+            name="Kenya",
+            title="Kenya",
+            pyramid_dataset="Kenya-1950-2020",
+            growth_dataset="Kenya-Growth-1950-2020",
+            slug="kenya",
+            dtm_stage="Stage 2 – Early Expanding",
+            tick_limit=3500000,
+            tick_step=500000,
+            capital="Nairobi, Kenya",
+            capital_lat=-1.2921,
+            capital_lon=36.8219,
+            map_lat=0.1,
+            map_lon=38,
+            map_zoom=4.5,
+        ),
+        Country(
+            key="India",
+            name="India",
+            title="India",
+            pyramid_dataset="India-1950-2020",
+            growth_dataset="India-Growth-1950-2020",
+            slug="india",
+            dtm_stage="Stage 3 – Late Expanding",
+            tick_limit=60000000,
+            tick_step=20000000,
+            capital="New Delhi, India",
+            capital_lat=28.6139,
+            capital_lon=77.2090,
+            map_lat=23.2,
+            map_lon=81,
+            map_zoom=2.8,
+            growth_unit="Billions",
+        ),
+        Country(
+            key="Japan",
+            name="Japan",
+            title="Japan",
+            pyramid_dataset="Japan-1950-2020",
+            growth_dataset="Japan-Growth-1950-2020",
+            slug="japan",
+            dtm_stage="Stage 5 – Declining",
+            tick_limit=6000000,
+            tick_step=2000000,
+            capital="Tokyo, Japan",
+            capital_lat=35.6762,
+            capital_lon=139.6503,
+            map_lat=38.3,
+            map_lon=139,
+            map_zoom=3.5,
+        ),
+    ]
+}
@@ -0,0 +1,155 @@
+"""Memory-mapped population cube shared by every page and server process.
+
+``python -m panpop.compile`` also writes ``data/compiled/population_cube.npy``,
+a single ``int32`` array of shape (country, year, age group, sex) built from
+the pyramid dataset of every country in ``panpop.countries.COUNTRIES``, plus
+a JSON sidecar with its axis labels and the digest of each source workbook.
+
+``load_cube`` maps the file read-only, so slices are views into one mapping
+and every Streamlit process on the host shares the same physical pages
+through the OS page cache. ``update_cube`` rewrites only the slices of the
+datasets an append changed.
+"""
+
+import json
+import os
+from collections import Counter
+
+import numpy as np
+
+from panpop.cache import data_cache
+from panpop.countries import COUNTRIES
+from panpop.data import COMPILED_DIR, dataset_version, load_dataset
+
+CUBE_PATH = COMPILED_DIR / "population_cube.npy"
+LABELS_PATH = COMPILED_DIR / "population_cube.json"
+SEXES = ["male", "female"]
+
+
+class PopulationCube:
+    def __init__(self, values, labels):
+        self.values = values
+        self.datasets = labels["datasets"]
+        self.years = np.asarray(labels["years"])
+        self.ages = np.asarray(labels["ages"], dtype=object)
+        self.digests = labels["digests"]
+        self._positions = {
+            "dataset": {name: i for i, name in enumerate(self.datasets)},
+            "year": {int(year): i for i, year in enumerate(self.years)},
+            "age": {age: i for i, age in enumerate(self.ages)},
+            "sex": {sex: i for i, sex in enumerate(SEXES)},
+        }
+
+    @classmethod
+    def open(cls):
+        with open(LABELS_PATH) as f:
+            labels = json.load(f)
+        return cls(np.load(CUBE_PATH, mmap_mode="r"), labels)
+
+    def __contains__(self, dataset):
+        return dataset in self._positions["dataset"]
+
+    def is_current(self, dataset):
+        """Whether ``dataset`` is in the cube and its workbook is unchanged."""
+        return dataset in self and self.digests[dataset] == dataset_version(dataset)
+
+    def sel(self, dataset, year=None, age=None, sex=None):
+        """Slice the cube by label; omitted axes are kept whole.
+
+        ``cube.sel("USA-1950-2020", sex="male")`` is a (year, age group) view.
+        """
+        index = [self._positions["dataset"][dataset]]
+        for axis, label in [("year", year), ("age", age), ("sex", sex)]:
+            index.append(slice(None) if label is None else self._positions[axis][label])
+        return self.values[tuple(index)]
+
+
+def cube_axes(df):
+    """``(years, age groups)`` of a pyramid frame, as the cube labels them."""
+    years = tuple(int(year) for year in sorted(df["Year"].unique()))
+    return years, tuple(df["Age Group"].cat.categories)
+
+
+def fill(values, position, df, years):
+    """Copy the pyramid frame ``df`` into ``values[position]``."""
+    year_pos = np.searchsorted(years, df["Year"].to_numpy())
+    age_pos = df["Age Group"].cat.codes.to_numpy()
+    values[position, year_pos, age_pos, 0] = df["Male Population"].to_numpy()
+    values[position, year_pos, age_pos, 1] = df["Female Population"].to_numpy()
+
+
+def write_cube(values, labels):
+    # Write beside the target and rename, so processes that already mapped the
+    # old cube keep reading a complete file.
+    COMPILED_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_cube = CUBE_PATH.with_suffix(".tmp.npy")
+    tmp_labels = LABELS_PATH.with_suffix(".tmp.json")
+    np.save(tmp_cube, values)
+    with open(tmp_labels, "w") as f:
+        json.dump(labels, f, indent=2)
+    os.replace(tmp_cube, CUBE_PATH)
+    os.replace(tmp_labels, LABELS_PATH)
+
+
+def build_cube():
+    """Build the cube; return its shape and the datasets left out of it.
+
+    The cube holds the pyramid datasets that cover the most common years and
+    age groups. Any other, such as one ``--append`` gave an extra year, is
+    left out and its pages read its own dataset.
+    """
+    frames = {
+        country.pyramid_dataset: load_dataset(country.pyramid_dataset)
+        for country in COUNTRIES.values()
+    }
+    axes = {name: cube_axes(df) for name, df in frames.items()}
+    years, ages = Counter(axes.values()).most_common(1)[0][0]
+    datasets = [name for name in frames if axes[name] == (years, ages)]
+
+    values = np.zeros((len(datasets), len(years), len(ages), len(SEXES)), np.int32)
+    for position, name in enumerate(datasets):
+        fill(values, position, frames[name], years)
+
+    labels = {
+        "datasets": datasets,
+        "years": list(years),
+        "ages": list(ages),
+        "sexes": SEXES,
+        "digests": {name: dataset_version(name) for name in datasets},
+    }
+    write_cube(values, labels)
+    return values.shape, [name for name in frames if name not in datasets]
+
+
+def update_cube(names):
+    """Refresh the datasets ``names`` in the cube, leaving the others as built.
+
+    Returns the datasets that no longer cover the cube's years and age groups;
+    they stay out of date, so their pages read their own dataset.
+    """
+    with open(LABELS_PATH) as f:
+        labels = json.load(f)
+    # A private copy: the mapping other processes read is replaced, not changed.
+    values = np.load(CUBE_PATH)
+    years, ages = tuple(labels["years"]), tuple(labels["ages"])
+
+    left_out = []
+    for name in names:
+        df = load_dataset(name)
+        if cube_axes(df) != (years, ages):
+            left_out.append(name)
+            continue
+        if name not in labels["datasets"]:
+            labels["datasets"].append(name)
+            values = np.concatenate([values, np.zeros((1, *values.shape[1:]), values.dtype)])
+        fill(values, labels["datasets"].index(name), df, years)
+        labels["digests"][name] = dataset_version(name)
+    write_cube(values, labels)
+    return left_out
+
+
+def load_cube():
+    """The process-wide mapping of the cube, or ``None`` if it was never built."""
+    if not (CUBE_PATH.exists() and LABELS_PATH.exists()):
+        return None
+    return data_cache.get(LABELS_PATH, PopulationCube.open, tag="cube")
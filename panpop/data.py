@@ -0,0 +1,237 @@
+"""Dataset loading for the PanPop pages.
+
+Every workbook in ``data/`` is addressed by its file stem (for example
+``"USA-1950-2020"``). ``load_dataset`` reads the compiled Parquet artifact
+produced by ``python -m panpop.compile`` and only falls back to parsing the
+original Excel workbook when that artifact is missing or stale. Loaded frames
+are converted to compact dtypes by ``compact`` and held in
+``panpop.cache.data_cache`` until the source workbook changes, or an append
+rewrites the artifact (see ``cache_tag``), with ``panpop.cache.disk_cache``
+beneath it so a restarted server skips the parse.
+
+``load_datasets`` loads a batch of datasets concurrently, in threads or, for
+the CPU-bound Excel parse, in worker processes; ``PANPOP_LOAD_EXECUTOR`` and
+``PANPOP_LOAD_WORKERS`` set its defaults.
+"""
+
+import json
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from multiprocessing import get_context
+from pathlib import Path
+
+import pandas as pd
+
+from panpop.cache import data_cache, disk_cache, file_digest
+from panpop.timing import timed
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+COMPILED_DIR = DATA_DIR / "compiled"
+MANIFEST_PATH = COMPILED_DIR / "manifest.json"
+
+SCHEMAS = {
+    "pyramid": {
+        "Age Group": "object",
+        "Male Population": "int64",
+        "Female Population": "int64",
+        "Year": "int64",
+    },
+    "growth": {
+        "Year": "int64",
+        "Population": "int64",
+    },
+    "comparison": {
+        "Country": "object",
+        "Year": "int64",
+        "Population": "int64",
+    },
+}
+
+
+def source_path(name):
+    return DATA_DIR / f"{name}.xlsx"
+
+
+def artifact_path(name):
+    return COMPILED_DIR / f"{name}.parquet"
+
+
+def dataset_names():
+    return sorted(path.stem for path in DATA_DIR.glob("*.xlsx"))
+
+
+def schema_for(columns):
+    """Return the ``(kind, dtypes)`` pair whose columns match ``columns``."""
+    columns = set(columns)
+    for kind, dtypes in SCHEMAS.items():
+        if set(dtypes) == columns:
+            return kind, dtypes
+    raise ValueError(f"Unrecognised dataset columns: {sorted(columns)}")
+
+
+def apply_schema(df):
+    _, dtypes = schema_for(df.columns)
+    return df.astype(dtypes)
+
+
+def compact(df):
+    """Return ``df`` with the narrowest dtypes that hold its values.
+
+    Label columns become categoricals in order of first appearance (ordered,
+    youngest first, for ``Age Group``), ``Year`` becomes ``int16`` and counts
+    the smallest signed integer type that fits, so negated male populations
+    in the pyramids cannot wrap around.
+    """
+    columns = {}
+    for column, values in df.items():
+        if column == "Year":
+            columns[column] = values.astype("int16")
+        elif pd.api.types.is_integer_dtype(values):
+            columns[column] = pd.to_numeric(values, downcast="integer")
+        else:
+            columns[column] = pd.Categorical(
+                values,
+                categories=pd.unique(values),
+                ordered=column == "Age Group",
+            )
+    return pd.DataFrame(columns, index=df.index)
+
+
+def memory_footprint(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def read_manifest():
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def is_fresh(name, manifest=None):
+    """Whether the compiled artifact for ``name`` matches its source workbook."""
+    if manifest is None:
+        manifest = read_manifest()
+    entry = manifest.get("datasets", {}).get(name)
+    if entry is None or not artifact_path(name).exists():
+        return False
+    return entry["sha256"] == file_digest(source_path(name))
+
+
+def read_excel(name):
+    return apply_schema(pd.read_excel(source_path(name)))
+
+
+def read_compiled(name):
+    return pd.read_parquet(artifact_path(name))
+
+
+def read_dataset(name):
+    if is_fresh(name):
+        return read_compiled(name)
+    return read_excel(name)
+
+
+def load_appended():
+    return {
+        name: entry["appended_sha256"]
+        for name, entry in read_manifest().get("datasets", {}).items()
+        if "appended_sha256" in entry
+    }
+
+
+def appended_versions():
+    """Artifact digest of every dataset with appended years, by name."""
+    if not MANIFEST_PATH.exists():
+        return {}
+    return data_cache.get(MANIFEST_PATH, load_appended, tag="appended")
+
+
+def cache_tag(name, tag=""):
+    """``data_cache`` tag of a value derived from ``name``.
+
+    ``data_cache`` validates entries on the workbook, which an append leaves
+    untouched, so the digest of the appended artifact goes into the key.
+    """
+    appended = appended_versions().get(name)
+    return tag if appended is None else f"{tag}+{appended}"
+
+
+def dataset_version(name):
+    """Content digest of the data behind ``name``, for keying derived caches.
+
+    That is the digest of its workbook, followed by the digest of its
+    artifact when ``python -m panpop.ingest --append`` added years to it.
+    """
+    appended = appended_versions().get(name)
+    version = data_cache.digest(source_path(name))
+    return version if appended is None else f"{version}+{appended}"
+
+
+def disk_key(name):
+    return (name, dataset_version(name))
+
+
+def cache_frame(name, load):
+    """Hold the frame ``load()`` compacts in ``data_cache`` and ``disk_cache``."""
+    return data_cache.get(
+        source_path(name),
+        lambda: disk_cache.get("datasets", disk_key(name), lambda: compact(load())),
+        tag=cache_tag(name),
+    )
+
+
+def load_dataset(name):
+    """Cached, compacted ``read_dataset``; the frame is shared, do not mutate it."""
+    with timed("load_dataset", dataset=name):
+        return cache_frame(name, lambda: read_dataset(name))
+
+
+def make_executor(kind=None, max_workers=None):
+    """A ``"thread"`` or ``"process"`` pool for ``load_datasets``.
+
+    Worker processes are spawned rather than forked, since the Streamlit
+    server that forks them runs many threads.
+    """
+    kind = kind or os.environ.get("PANPOP_LOAD_EXECUTOR", "thread")
+    if max_workers is None and os.environ.get("PANPOP_LOAD_WORKERS"):
+        max_workers = int(os.environ["PANPOP_LOAD_WORKERS"])
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers, thread_name_prefix="panpop-load")
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers, mp_context=get_context("spawn"))
+    raise ValueError(f"Unknown executor {kind!r}, expected 'thread' or 'process'")
+
+
+def load_datasets(names, executor=None, reader=read_dataset):
+    """Load ``names`` concurrently, yielding ``(name, frame)`` as each completes.
+
+    ``executor`` is ``"thread"``, ``"process"`` or an existing
+    ``concurrent.futures.Executor``, which is left running. Datasets already
+    in ``data_cache`` or ``disk_cache`` are yielded first; the others are read
+    by ``reader`` in the pool and compacted and cached here, so every result
+    is the shared frame ``load_dataset`` returns.
+    """
+    pending = []
+    for name in names:
+        cached = data_cache.cached(source_path(name), cache_tag(name))
+        if cached or disk_cache.contains("datasets", disk_key(name)):
+            yield name, load_dataset(name)
+        else:
+            pending.append(name)
+    if not pending:
+        return
+
+    pool = executor if isinstance(executor, Executor) else make_executor(executor)
+    try:
+        futures = {pool.submit(reader, name): name for name in pending}
+        for future in as_completed(futures):
+            name = futures[future]
+            frame = future.result()
+            with timed("load_dataset", dataset=name):
+                df = cache_frame(name, lambda: frame)
+            yield name, df
+    finally:
+        if pool is not executor:
+            pool.shutdown(cancel_futures=True)
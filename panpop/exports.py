@@ -0,0 +1,78 @@
+"""Downloadable exports of the page dataframes.
+
+Exports are only generated when a visitor asks for one, in any of
+``EXPORT_FORMATS``. The resulting bytes are kept in ``export_cache`` keyed on
+the export name, format and the content of the frame, so repeated downloads
+of the same filtered view skip the writers entirely, and in ``disk_cache``,
+so they also survive a restart.
+"""
+
+import hashlib
+import io
+import time
+
+import pandas as pd
+
+from panpop.cache import LRUCache, disk_cache
+from panpop.metrics import EXPORT_BYTES, EXPORT_REQUESTS, EXPORT_SECONDS
+from panpop.timing import timed
+
+MAX_EXPORT_BYTES = 32 * 1024 * 1024
+# Excel rejects worksheet names longer than this.
+MAX_SHEET_NAME = 31
+
+export_cache = LRUCache(MAX_EXPORT_BYTES)
+
+
+def frame_digest(df):
+    """Digest of a frame's index and values, identifying any filtered view."""
+    hashed = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    columns = "\0".join(map(str, df.columns)).encode()
+    return hashlib.sha1(hashed.tobytes() + columns).hexdigest()
+
+
+def to_csv(df, sheet_name):
+    # Written in one go: st.download_button takes the whole payload as bytes.
+    return df.to_csv(index=False).encode()
+
+
+def to_parquet(df, sheet_name):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), buffer)
+    return buffer.getvalue()
+
+
+def to_excel(df, sheet_name):
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
+        df.to_excel(writer, sheet_name=sheet_name[:MAX_SHEET_NAME], index=False)
+    return buffer.getvalue()
+
+
+# extension -> (label, mime type, writer)
+EXPORT_FORMATS = {
+    "xlsx": ("Excel", "application/vnd.ms-excel", to_excel),
+    "csv": ("CSV", "text/csv", to_csv),
+    "parquet": ("Parquet", "application/vnd.apache.parquet", to_parquet),
+}
+
+
+def generate(df, export_name, extension):
+    _, _, writer = EXPORT_FORMATS[extension]
+    start = time.perf_counter()
+    data = writer(df, export_name)
+    EXPORT_SECONDS.observe(time.perf_counter() - start, format=extension)
+    EXPORT_BYTES.observe(len(data), format=extension)
+    return data
+
+
+def export(df, export_name, extension):
+    EXPORT_REQUESTS.inc(format=extension)
+    with timed("export", export=export_name, format=extension):
+        key = (export_name, extension, frame_digest(df))
+        return export_cache.get(
+            key, lambda: disk_cache.get("exports", key, lambda: generate(df, export_name, extension))
+        )
@@ -0,0 +1,74 @@
+"""Population growth series derived from the pyramid datasets.
+
+A country's population in a year is the sum of its male and female counts
+over the age groups of its pyramid, so the growth charts need no workbook of
+their own: ``load_growth`` sums the pyramid frame the page has already
+loaded with one groupby, and ``load_comparison`` does the same for every
+featured country at once, loading their pyramids concurrently with
+``load_datasets``, as the (Country, Year, Population) table of the
+comparison page. Both are compacted like loaded datasets and kept in
+``growth_cache`` under the digests of the pyramid workbooks they came from.
+
+``benchmarks/check_growth.py`` reports any divergence from the published
+growth workbooks, which the pages no longer read.
+"""
+
+import pandas as pd
+
+from panpop.cache import LRUCache
+from panpop.countries import COUNTRIES
+from panpop.data import compact, dataset_version, load_dataset, load_datasets, memory_footprint
+from panpop.timing import timed
+
+MAX_GROWTH_BYTES = 8 * 1024 * 1024
+SEX_COLUMNS = ["Male Population", "Female Population"]
+
+growth_cache = LRUCache(MAX_GROWTH_BYTES, sizeof=memory_footprint)
+
+
+def growth_series(df, by=("Year",)):
+    """Total population of a pyramid frame per ``by``, in the growth schema."""
+    totals = df.groupby(list(by), sort=False, observed=True)[SEX_COLUMNS].sum()
+    population = totals[SEX_COLUMNS[0]].astype("int64") + totals[SEX_COLUMNS[1]]
+    return population.rename("Population").reset_index()
+
+
+def growth_version(country):
+    return dataset_version(country.pyramid_dataset)
+
+
+def load_growth(country):
+    """Growth series of a featured country; shared, do not mutate it."""
+    return growth_cache.get(
+        ("growth", country.key, growth_version(country)),
+        lambda: compute_growth(country),
+    )
+
+
+def compute_growth(country):
+    with timed("growth_series", country=country.key):
+        return compact(growth_series(load_dataset(country.pyramid_dataset)))
+
+
+def load_comparison(countries=None):
+    """(Country, Year, Population) of ``countries``, by default every featured one."""
+    countries = list(COUNTRIES.values()) if countries is None else list(countries)
+    key = ("comparison", tuple((country.key, growth_version(country)) for country in countries))
+    return growth_cache.get(key, lambda: compute_comparison(countries))
+
+
+def compute_comparison(countries):
+    with timed("growth_series", country="comparison"):
+        frames = dict(load_datasets([country.pyramid_dataset for country in countries]))
+        stacked = pd.concat(
+            [
+                frames[country.pyramid_dataset][["Year", *SEX_COLUMNS]]
+                .assign(Country=country.name)
+                for country in countries
+            ],
+            ignore_index=True,
+        )
+        comparison = compact(growth_series(stacked, by=("Country", "Year")))
+        # Plain strings: plotly groups ``color`` by this column and warns
+        # about the ``observed`` default on an unordered categorical.
+        return comparison.astype({"Country": str})
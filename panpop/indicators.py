@@ -0,0 +1,119 @@
+"""Demographic indicators derived from the pyramid data.
+
+``compute_indicators`` takes the (year, age group) arrays of a
+``PyramidIndex`` and computes every year at once with array operations:
+
+- youth, old-age and total dependency ratios: people aged 0-14, 65+ and
+  both, per 100 people aged 15-64;
+- median age, interpolated linearly within the age group holding the middle
+  person;
+- share of the population aged 65+, in percent;
+- sex ratio of every age group, in males per 100 females.
+
+``load_indicators`` keeps the result in ``indicators_cache`` under the
+version of the index, so each dataset or catalogue partition is computed
+once.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from panpop.cache import LRUCache
+from panpop.data import memory_footprint
+from panpop.timing import timed
+
+MAX_INDICATOR_BYTES = 8 * 1024 * 1024
+YOUTH_END = 15
+OLD_AGE_START = 65
+# Width assumed for the open-ended oldest group, such as "100+".
+OPEN_AGE_WIDTH = 5
+
+
+def age_bounds(ages):
+    """``(lower, width)`` arrays of age group labels like ``"15-19"`` and ``"100+"``."""
+    lower, width = [], []
+    for label in ages:
+        label = str(label)
+        if label.endswith("+"):
+            lower.append(int(label[:-1]))
+            width.append(OPEN_AGE_WIDTH)
+        else:
+            first, last = label.split("-")
+            lower.append(int(first))
+            width.append(int(last) - int(first) + 1)
+    return np.array(lower), np.array(width)
+
+
+def ratio(numerator, denominator, scale=100):
+    """``scale * numerator / denominator``, NaN where the denominator is 0."""
+    out = np.full(np.shape(numerator), np.nan)
+    np.divide(numerator * scale, denominator, out=out, where=denominator != 0)
+    return out
+
+
+@dataclass(frozen=True)
+class Indicators:
+    # One row per year.
+    summary: pd.DataFrame
+    # One row per year, one column of males per 100 females per age group.
+    sex_ratio: pd.DataFrame
+
+    def table(self):
+        """The summary with a ``Sex Ratio <age group>`` column per age group."""
+        sex_ratio = self.sex_ratio.drop(columns="Year").add_prefix("Sex Ratio ")
+        return pd.concat([self.summary, sex_ratio], axis=1)
+
+
+def compute_indicators(index):
+    male = np.asarray(index.male, dtype=np.int64)
+    female = np.asarray(index.female, dtype=np.int64)
+    people = male + female
+    lower, width = age_bounds(index.ages)
+
+    youth = people[:, lower + width <= YOUTH_END].sum(axis=1)
+    old = people[:, lower >= OLD_AGE_START].sum(axis=1)
+    total = people.sum(axis=1)
+    working = total - youth - old
+
+    # Median age: the group where the cumulative count first reaches half
+    # the total, plus the fraction of that group below the middle person.
+    cumulative = people.cumsum(axis=1)
+    half = total / 2
+    group = (cumulative >= half[:, None]).argmax(axis=1)
+    rows = np.arange(len(group))
+    below = cumulative[rows, group] - people[rows, group]
+    median = lower[group] + ratio(half - below, people[rows, group], width[group])
+
+    years = np.asarray(index.years, dtype=np.int64)
+    summary = pd.DataFrame(
+        {
+            "Year": years,
+            "Total Dependency Ratio": ratio(youth + old, working),
+            "Youth Dependency Ratio": ratio(youth, working),
+            "Old-Age Dependency Ratio": ratio(old, working),
+            "Median Age": median,
+            "Share Aged 65+ (%)": ratio(old, total),
+        }
+    ).round(2)
+    sex_ratio = pd.DataFrame(ratio(male, female), columns=[str(age) for age in index.ages]).round(2)
+    sex_ratio.insert(0, "Year", years)
+    return Indicators(summary, sex_ratio)
+
+
+def indicators_size(indicators):
+    return memory_footprint(indicators.summary) + memory_footprint(indicators.sex_ratio)
+
+
+indicators_cache = LRUCache(MAX_INDICATOR_BYTES, sizeof=indicators_size)
+
+
+def load_indicators(country, index):
+    """Indicators of ``index``, cached per dataset version; do not mutate them."""
+
+    def compute():
+        with timed("indicators", country=country.key):
+            return compute_indicators(index)
+
+    return indicators_cache.get((country.key, index.version), compute)
@@ -0,0 +1,357 @@
+"""Ingest a long-format population file into the catalogue partitions.
+
+The source is a CSV with one row per (country, year, age, sex), such as a UN
+World Population Prospects extract, with these columns (any case; others are
+ignored)::
+
+    country,year,age,sex,population
+    Kenya,1950,0,Male,1051.3
+
+Run from the repository root::
+
+    python -m panpop.ingest WPP.csv [--scale 1000] [--country Kenya ...] [--chunksize 500000]
+
+The source is streamed ``--chunksize`` rows at a time: each chunk is filtered,
+mapped to age group and sex codes and summed into a dense array of running
+totals (see ``Totals``), so peak memory depends on the number of countries
+and years rather than on the size of the file. The peak RSS is reported.
+
+Ages are single years, with ``100+`` for the open interval, or the pyramid's
+five-year groups; single years are summed into the groups. ``sex`` is
+``male`` or ``female`` (or ``m``/``f``); other rows, such as totals, are
+dropped. ``--scale`` multiplies the counts, for sources in thousands.
+
+Every country becomes ``data/compiled/catalogue/<key>.parquet`` in the pyramid
+schema of ``panpop.data.SCHEMAS``, and ``manifest.json`` beside it lists each
+country's name, partition and digest (see ``panpop.catalogue``). Ingesting
+replaces the whole catalogue, unless ``--append`` is given.
+
+``--append`` merges a source holding new or revised years into the existing
+catalogue: only the partitions of the countries it covers are rewritten and
+their manifest entries updated, and a running server then drops only the
+cached partitions, figures and indicators of those countries::
+
+    python -m panpop.ingest --append WPP-2021.csv --scale 1000
+
+The years are also merged into the compiled datasets of the featured
+countries the source covers, and the population cube is refreshed for those
+countries only (see ``append_featured``).
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from panpop import catalogue, cube, data
+from panpop.compile import compile_dataset, write_artifact, write_manifest as write_datasets
+from panpop.countries import COUNTRIES
+from panpop.data import SCHEMAS, file_digest
+
+COLUMNS = ["country", "year", "age", "sex", "population"]
+AGE_GROUPS = [f"{low}-{low + 4}" for low in range(0, 100, 5)] + ["100+"]
+SEX_COLUMNS = ["Male Population", "Female Population"]
+SEXES = {"male": 0, "m": 0, "female": 1, "f": 1}
+CHUNKSIZE = 500_000
+
+
+def age_group(age):
+    """The five-year group of a single-year age or group label."""
+    label = str(age).strip()
+    if label in AGE_GROUPS:
+        return label
+    years = int(label.rstrip("+"))
+    if years >= 100:
+        return "100+"
+    low = years - years % 5
+    return f"{low}-{low + 4}"
+
+
+def source_columns(path):
+    """Map the source's column names to ``COLUMNS``."""
+    header = pd.read_csv(path, nrows=0).columns
+    names = {column: column.lower() for column in header if column.lower() in COLUMNS}
+    missing = set(COLUMNS) - set(names.values())
+    if missing:
+        raise ValueError(f"{path} lacks the column(s) {sorted(missing)}")
+    return names
+
+
+def read_chunks(path, chunksize=CHUNKSIZE):
+    """The source ``chunksize`` rows at a time, columns renamed to ``COLUMNS``."""
+    names = source_columns(path)
+    chunks = pd.read_csv(
+        path,
+        usecols=list(names),
+        dtype={
+            column: "category" for column, name in names.items() if name in ("country", "age", "sex")
+        },
+        chunksize=chunksize,
+    )
+    for chunk in chunks:
+        yield chunk.rename(columns=names)
+
+
+def category_codes(values, mapping):
+    """Positions of a categorical's values after mapping its categories; -1 if unmapped."""
+    lookup = np.array([mapping(category) for category in values.cat.categories] + [-1])
+    # Missing values have code -1, which picks the trailing -1.
+    return lookup[values.cat.codes.to_numpy()]
+
+
+def reshape(chunk, scale=1, countries=None):
+    """Filter one chunk and sum it by (country, year, age group, sex) code.
+
+    Rows for other sexes (such as totals), other countries than ``countries``
+    and missing counts are dropped.
+    """
+    sex = category_codes(chunk["sex"], lambda label: SEXES.get(str(label).strip().lower(), -1))
+    age = category_codes(chunk["age"], lambda label: AGE_GROUPS.index(age_group(label)))
+    keep = (sex >= 0) & (age >= 0) & chunk["population"].notna().to_numpy()
+    if countries is not None:
+        keep &= chunk["country"].isin(countries).to_numpy()
+    partial = pd.DataFrame(
+        {
+            "country": chunk["country"].to_numpy()[keep],
+            "year": chunk["year"].to_numpy()[keep],
+            "age": age[keep],
+            "sex": sex[keep],
+            "population": chunk["population"].to_numpy()[keep] * scale,
+        }
+    )
+    totals = partial.groupby(["country", "year", "age", "sex"], sort=False)["population"].sum()
+    return totals.reset_index()
+
+
+class Totals:
+    """Running population sums by (country, year, age group, sex).
+
+    Sums are kept in one dense array that grows with the countries and years
+    seen, so memory depends on the size of the catalogue, not of the source.
+    """
+
+    def __init__(self):
+        self.countries = pd.Index([], dtype=object)
+        self.years = pd.Index([], dtype="int64")
+        self.values = np.zeros((0, 0, len(AGE_GROUPS), len(SEX_COLUMNS)))
+        self.seen = np.zeros((0, 0), bool)
+
+    def _positions(self, attr, labels):
+        index = getattr(self, attr)
+        new = pd.Index(pd.unique(labels)).difference(index)
+        if len(new):
+            index = index.append(new)
+            setattr(self, attr, index)
+        return index.get_indexer(labels)
+
+    def add(self, partial):
+        country = self._positions("countries", partial["country"].to_numpy())
+        year = self._positions("years", partial["year"].to_numpy())
+        grow = (len(self.countries) - self.values.shape[0], len(self.years) - self.values.shape[1])
+        if any(grow):
+            self.values = np.pad(self.values, [(0, grow[0]), (0, grow[1]), (0, 0), (0, 0)])
+            self.seen = np.pad(self.seen, [(0, grow[0]), (0, grow[1])])
+        np.add.at(
+            self.values,
+            (country, year, partial["age"].to_numpy(), partial["sex"].to_numpy()),
+            partial["population"].to_numpy(),
+        )
+        self.seen[country, year] = True
+
+    def frames(self):
+        """``(country, frame)`` in the pyramid schema, for every year seen."""
+        order = np.argsort(self.years.to_numpy())
+        years = self.years.to_numpy()[order]
+        for row, name in enumerate(self.countries):
+            present = self.seen[row, order]
+            counts = np.rint(self.values[row, order][present]).astype("int64")
+            n_years = int(present.sum())
+            yield name, pd.DataFrame(
+                {
+                    "Age Group": np.tile(AGE_GROUPS, n_years),
+                    SEX_COLUMNS[0]: counts[..., 0].ravel(),
+                    SEX_COLUMNS[1]: counts[..., 1].ravel(),
+                    "Year": np.repeat(years[present], len(AGE_GROUPS)),
+                }
+            )
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+def write_partition(key, df):
+    """Write ``df`` atomically and return its manifest entry."""
+    path = catalogue.partition_path(key)
+    table = write_artifact(df, path, SCHEMAS["pyramid"])
+    return {
+        "partition": path.name,
+        "sha256": file_digest(path),
+        "rows": table.num_rows,
+        "years": [int(df["Year"].min()), int(df["Year"].max())],
+    }
+
+
+def write_manifest(manifest):
+    tmp = catalogue.MANIFEST_PATH.with_suffix(".tmp.json")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, catalogue.MANIFEST_PATH)
+
+
+def read_totals(path, scale=1, countries=None, chunksize=CHUNKSIZE):
+    """Stream ``path`` into ``Totals``; return them with the read stats."""
+    totals = Totals()
+    rows = chunks = 0
+    for chunk in read_chunks(path, chunksize):
+        totals.add(reshape(chunk, scale, countries))
+        rows += len(chunk)
+        chunks += 1
+    return totals, {"rows": rows, "chunks": chunks}
+
+
+def ingest(path, scale=1, countries=None, chunksize=CHUNKSIZE):
+    """Replace the catalogue with ``path``; return the manifest entries and stats."""
+    catalogue.CATALOGUE_DIR.mkdir(parents=True, exist_ok=True)
+    totals, stats = read_totals(path, scale, countries, chunksize)
+
+    entries = {}
+    for name, frame in totals.frames():
+        key = catalogue.country_key(name)
+        if key in entries:
+            raise ValueError(f"{name!r} and {entries[key]['name']!r} share the key {key!r}")
+        entries[key] = {"name": name, **write_partition(key, frame)}
+
+    for stale in set(catalogue.CATALOGUE_DIR.glob("*.parquet")) - {
+        catalogue.partition_path(key) for key in entries
+    }:
+        stale.unlink()
+    write_manifest({"source": Path(path).name, "countries": entries})
+    return entries, dict(stats, peak_rss_mb=round(peak_rss_mb(), 1))
+
+
+def merge_years(old, new):
+    """``old`` with the years of ``new`` replaced or added, in year order."""
+    kept = old[~old["Year"].isin(new["Year"].unique())]
+    return pd.concat([kept, new], ignore_index=True).sort_values("Year", kind="stable")
+
+
+def append(path, scale=1, countries=None, chunksize=CHUNKSIZE):
+    """Merge the years in ``path`` into the catalogue; return the updated entries and stats.
+
+    Only the partitions of countries in ``path`` are rewritten; a year they
+    already hold is replaced, so revisions and new years are both appended.
+    Countries the catalogue lacks, or every one if it was never ingested, get
+    a new partition.
+    """
+    catalogue.CATALOGUE_DIR.mkdir(parents=True, exist_ok=True)
+    data.COMPILED_DIR.mkdir(parents=True, exist_ok=True)
+    # Without a full ingest there is no catalogue yet: every country covered
+    # gets a new partition.
+    manifest = {"countries": {}}
+    if catalogue.MANIFEST_PATH.exists():
+        with open(catalogue.MANIFEST_PATH) as f:
+            manifest = json.load(f)
+    entries = manifest["countries"]
+    totals, stats = read_totals(path, scale, countries, chunksize)
+
+    slugs = {country.slug for country in COUNTRIES.values()}
+    updated, featured = {}, {}
+    for name, frame in totals.frames():
+        key = catalogue.country_key(name)
+        if key in updated:
+            raise ValueError(f"{name!r} and {updated[key]['name']!r} share the key {key!r}")
+        if key in slugs:
+            featured[key] = frame
+        if key in entries:
+            frame = merge_years(pd.read_parquet(catalogue.partition_path(key)), frame)
+        updated[key] = {"name": name, **write_partition(key, frame)}
+
+    # Written after the partitions: a server reloads a country once its
+    # digest in the manifest changes.
+    manifest["countries"] = {**entries, **updated}
+    manifest["appended"] = manifest.get("appended", []) + [Path(path).name]
+    write_manifest(manifest)
+    datasets, left_out = append_featured(featured, Path(path).name)
+    stats = dict(stats, datasets=datasets, left_out=left_out)
+    return updated, dict(stats, peak_rss_mb=round(peak_rss_mb(), 1))
+
+
+def append_featured(frames, source):
+    """Merge ``frames``, by catalogue key, into the featured countries' datasets.
+
+    The compiled artifact of every featured country among ``frames`` is
+    rewritten with the merged years, and its entry in the compile manifest
+    records the source and the new artifact's digest, which a running server
+    picks up as a new ``dataset_version``. Only those datasets are then
+    refreshed in the population cube. Returns the updated datasets and those
+    left out of the cube because their years no longer match it.
+    """
+    names = {
+        country.slug: country.pyramid_dataset
+        for country in COUNTRIES.values()
+        if country.slug in frames
+    }
+    if not names:
+        return [], []
+    manifest = data.read_manifest()
+    entries = manifest.get("datasets", {})
+    for key, name in names.items():
+        if not data.is_fresh(name, manifest):
+            entries[name] = compile_dataset(name)
+        merged = merge_years(data.read_compiled(name), frames[key])
+        table = write_artifact(merged, data.artifact_path(name), SCHEMAS["pyramid"])
+        entries[name] = {
+            **entries[name],
+            "rows": table.num_rows,
+            "appended": entries[name].get("appended", []) + [source],
+            "appended_sha256": file_digest(data.artifact_path(name)),
+        }
+    write_datasets(entries)
+
+    datasets = sorted(names.values())
+    if not cube.CUBE_PATH.exists():
+        return datasets, []
+    return datasets, cube.update_cube(datasets)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="long-format CSV: country, year, age, sex, population")
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        help="merge the source's years into the existing catalogue instead of replacing it",
+    )
+    parser.add_argument("--scale", type=float, default=1, help="multiply counts, e.g. 1000")
+    parser.add_argument(
+        "--country", action="append", dest="countries", help="only ingest this country (repeatable)"
+    )
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE, help="rows read at a time")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    run = append if args.append else ingest
+    entries, stats = run(args.source, args.scale, args.countries, args.chunksize)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{stats['rows']} rows in {stats['chunks']} chunks -> "
+        f"{len(entries)} countries {'updated' if args.append else 'ingested'} "
+        f"in {elapsed:.2f}s, peak RSS {stats['peak_rss_mb']:.0f} MB -> {catalogue.CATALOGUE_DIR}"
+    )
+    for name in stats.get("datasets", []):
+        print(f"appended to {name}")
+    for name in stats.get("left_out", []):
+        print(f"{name} left out of the cube: its years no longer match the other countries'")
+
+
+if __name__ == "__main__":
+    main()
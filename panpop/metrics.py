@@ -0,0 +1,319 @@
+"""Prometheus-style metrics of the app, shared by every session.
+
+``registry`` holds counters, gauges and histograms and renders them in the
+Prometheus text exposition format. The data loaders, figure builders and
+export code feed it through ``panpop.timing`` (every timed section is observed
+in ``panpop_section_duration_seconds``; a page render is the ``rerun``
+section) and the metrics below; cache hit, miss and eviction counts and the
+number of active sessions are read when the metrics are rendered.
+
+Expose them by setting either variable before starting the server::
+
+    PANPOP_METRICS_PORT=9464 streamlit run HOME.py       # GET /metrics
+    PANPOP_METRICS_FILE=metrics.prom streamlit run HOME.py
+
+The file is rewritten atomically every ``PANPOP_METRICS_INTERVAL`` seconds
+(default 15), e.g. for node_exporter's textfile collector. The endpoint also
+answers ``/ready`` with 200 once every function in ``readiness_checks``
+returns true, and 503 before.
+"""
+
+import math
+import os
+import threading
+
+from panpop import timing
+from panpop.cache import data_cache, disk_cache
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BYTES_BUCKETS = tuple(1024 * 4**i for i in range(9))  # 1 KiB .. 64 MiB
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for value in labels.values()
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + "}"
+
+
+def format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """``(suffix, labels, value)`` for every sample of the metric."""
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield "", dict(zip(self.labelnames, key)), value
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=SECONDS_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self):
+        with self._lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        for key, (counts, total) in sorted(values.items()):
+            labels = dict(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, counts):
+                yield "_bucket", {**labels, "le": format_value(bound)}, count
+            yield "_sum", labels, total
+            yield "_count", labels, counts[-1]
+
+
+class CallbackMetric(Metric):
+    """A counter or gauge whose samples are read from ``collect()`` on render.
+
+    ``collect`` returns a mapping of label tuples (in ``labelnames`` order) to
+    values.
+    """
+
+    def __init__(self, name, help, kind, labelnames, collect):
+        super().__init__(name, help, labelnames)
+        self.kind = kind
+        self.collect = collect
+
+    def samples(self):
+        for key, value in sorted(self.collect().items()):
+            yield "", dict(zip(self.labelnames, key)), value
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=SECONDS_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{format_labels(labels)} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+readiness_checks = []
+
+SECTION_SECONDS = registry.histogram(
+    "panpop_section_duration_seconds",
+    "Duration of timed page sections; section=rerun is a whole page render.",
+    ["page", "section"],
+)
+FIGURE_BYTES = registry.histogram(
+    "panpop_figure_payload_bytes",
+    "Serialized size of each built Plotly figure.",
+    buckets=BYTES_BUCKETS,
+)
+EXPORT_SECONDS = registry.histogram(
+    "panpop_export_generation_seconds",
+    "Time spent writing an export file; its count is the number generated.",
+    ["format"],
+)
+EXPORT_BYTES = registry.histogram(
+    "panpop_export_bytes",
+    "Size of each generated export file.",
+    ["format"],
+    buckets=BYTES_BUCKETS,
+)
+EXPORT_REQUESTS = registry.counter(
+    "panpop_export_requests_total",
+    "Exports handed to a download button, generated or cached.",
+    ["format"],
+)
+
+
+def cache_stats():
+    # Imported here: the figure and export modules record into this one.
+    from panpop.catalogue import partition_cache
+    from panpop.exports import export_cache
+    from panpop.figures import figure_cache
+    from panpop.growth import growth_cache
+    from panpop.indicators import indicators_cache
+
+    return {
+        "data": data_cache.stats(),
+        "catalogue": partition_cache.stats(),
+        "figures": figure_cache.stats(),
+        "exports": export_cache.stats(),
+        "growth": growth_cache.stats(),
+        "indicators": indicators_cache.stats(),
+        "disk": disk_cache.stats(),
+    }
+
+
+def cache_counter(field):
+    def collect():
+        return {(cache,): stats[field] for cache, stats in cache_stats().items() if field in stats}
+
+    return collect
+
+
+for field, help in [
+    ("hits", "Cache lookups served from memory, or from disk for cache=disk."),
+    ("misses", "Cache lookups that loaded or built the value."),
+    ("evictions", "Entries dropped to stay within the cache's byte budget."),
+    ("invalidations", "Entries reloaded because their source file changed."),
+]:
+    registry.register(
+        CallbackMetric(f"panpop_cache_{field}_total", help, "counter", ["cache"], cache_counter(field))
+    )
+
+registry.register(
+    CallbackMetric(
+        "panpop_cache_entries",
+        "Entries currently held by each cache.",
+        "gauge",
+        ["cache"],
+        lambda: {(cache,): stats["entries"] for cache, stats in cache_stats().items()},
+    )
+)
+
+
+def active_sessions():
+    from streamlit.runtime import Runtime
+
+    if not Runtime.exists():
+        return {(): 0}
+    # The runtime has no public accessor for its session manager.
+    return {(): Runtime.instance()._session_mgr.num_active_sessions()}
+
+
+registry.register(
+    CallbackMetric(
+        "panpop_active_sessions", "Browser sessions connected to this server.", "gauge", [], active_sessions
+    )
+)
+
+
+def observe_section(record):
+    SECTION_SECONDS.observe(record["ms"] / 1e3, page=record["page"] or "", section=record["section"])
+
+
+timing.observers.append(observe_section)
+
+
+def write_file(path):
+    """Write the metrics to ``path`` atomically."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(registry.render())
+    os.replace(tmp, path)
+
+
+def serve(port, address="127.0.0.1"):
+    """Serve ``/metrics`` on ``address:port`` from a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path == "/metrics":
+                status, body = 200, registry.render().encode()
+            elif path == "/ready":
+                ready = all(check() for check in readiness_checks)
+                status, body = (200, b"ready\n") if ready else (503, b"warming up\n")
+            else:
+                self.send_error(404)
+                return
+            self.send_response(status)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((address, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="panpop-metrics", daemon=True).start()
+    return server
+
+
+def write_every(path, interval):
+    def loop():
+        while not stop.wait(interval):
+            write_file(path)
+
+    stop = threading.Event()
+    threading.Thread(target=loop, name="panpop-metrics-file", daemon=True).start()
+    return stop
+
+
+if os.environ.get("PANPOP_METRICS_PORT"):
+    serve(int(os.environ["PANPOP_METRICS_PORT"]))
+if os.environ.get("PANPOP_METRICS_FILE"):
+    write_every(os.environ["PANPOP_METRICS_FILE"], float(os.environ.get("PANPOP_METRICS_INTERVAL", 15)))
@@ -0,0 +1,383 @@
+"""Country page engine.
+
+``render_country_page`` draws everything on a country page from its entry in
+``panpop.countries.COUNTRIES``; the scripts in ``pages/`` only add their
+sidebar observations. ``render_catalogue_page`` draws the same sections for
+any country of the ingested catalogue, picked with a selector.
+"""
+
+import contextlib
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from panpop import catalogue
+from panpop.countries import CATALOGUE_PAGE, COUNTRIES
+from panpop.data import load_dataset
+from panpop.exports import EXPORT_FORMATS, export, frame_digest
+from panpop.figures import (
+    cached_animated_pyramid,
+    cached_growth,
+    cached_indicators,
+    cached_pyramid,
+)
+from panpop.growth import load_growth
+from panpop.indicators import load_indicators
+from panpop.profiling import env_enabled, profile
+from panpop.pyramid import load_pyramid_index
+from panpop.timing import records, rerun, timed
+
+
+def set_favicon(page_title):
+    favicon_path = "./img/favicon.ico"
+    st.set_page_config(page_title=page_title, page_icon=favicon_path)
+
+
+def local_css(file_name):
+    with open(file_name) as f:
+        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+
+
+def add_vertical_space(num_lines=1):
+    """Same as ``streamlit_extras.add_vertical_space``, which takes ~50 ms to import."""
+    for _ in range(num_lines):
+        st.write("")
+
+
+PROFILES_KEY = "debug-profiles"
+
+
+def profiling_requested():
+    return env_enabled() or st.query_params.get("profile") == "1"
+
+
+@contextlib.contextmanager
+def page_run(page, section="rerun"):
+    """Time this session's script run, and profile it when requested.
+
+    ``section`` is the fragment for fragment reruns; profiles are kept in the
+    session by (page, section) for ``debug_panel``.
+    """
+    ctx = get_script_run_ctx()
+    with profile(page, section, enabled=profiling_requested()) as capture:
+        with rerun(page, section, session=ctx.session_id if ctx else None):
+            yield
+    if capture:
+        st.session_state.setdefault(PROFILES_KEY, {})[page, section] = capture
+
+
+def debug_panel():
+    """Section timings of this rerun in the sidebar, shown with ``?debug=1``.
+
+    With profiling on, the latest profile of each rerun trigger follows.
+    Fragment reruns cannot draw in the sidebar; their timings still reach the
+    ``panpop.timing`` log, and their profiles show on the next full rerun.
+    """
+    profiling = profiling_requested()
+    if st.query_params.get("debug") != "1" and not profiling:
+        return
+    rows = [
+        {
+            "section": record["section"],
+            "ms": record["ms"],
+            "detail": ", ".join(
+                f"{name}={value}"
+                for name, value in record.items()
+                if name not in ("page", "session", "section", "ms")
+            ),
+        }
+        for record in records()
+    ]
+    with st.sidebar.expander("Debug: section timings", expanded=True):
+        st.dataframe(
+            pd.DataFrame(rows, columns=["section", "ms", "detail"]),
+            hide_index=True,
+            use_container_width=True,
+        )
+
+    if not profiling:
+        return
+    for (page, trigger), capture in st.session_state.get(PROFILES_KEY, {}).items():
+        with st.sidebar.expander(f"Debug: profile of {page} {trigger}"):
+            st.caption(capture["pstats"])
+            st.dataframe(pd.DataFrame(capture["top"]), hide_index=True)
+
+
+# The pyramid and each data table are fragments: changing the year, the
+# animation toggle or a table filter reruns only that section, not the page.
+@st.fragment
+def pyramid_section(country, index):
+    with page_run(country.page, "pyramid_section"):
+        animate = st.toggle(
+            "Play through every year in the browser",
+            help="Sends all years to the browser once, so moving the year slider "
+            "or pressing Play does not reload the page.",
+        )
+        if animate:
+            animated_pyramid_section(country, index)
+        else:
+            slider_pyramid_section(country, index)
+
+
+def animated_pyramid_section(country, index):
+    first, last = index.span
+    st.markdown(
+        f"<h4>Population Pyramid of {country.name} ({first} – {last})</h4>",
+        unsafe_allow_html=True,
+    )
+    fig = cached_animated_pyramid(country, index)
+    with timed("plotly_chart", chart="animated-pyramid"):
+        st.plotly_chart(fig)
+
+    st.markdown(
+        f"""<p style='text-align:center;'><a href="{country.source_url()}" target="_blank">View Data Source</a></p>""",
+        unsafe_allow_html=True,
+    )
+
+
+def slider_pyramid_section(country, index):
+    first, last = index.span
+    year = st.slider(
+        f"Select a year to display {country.name}’s population pyramid.",
+        min_value=first,
+        max_value=last,
+        value=first,
+    )
+
+    st.markdown(
+        f"<h4>Population Pyramid of {country.name} in {year}</h4>",
+        unsafe_allow_html=True,
+    )
+    fig = cached_pyramid(country, index, year)
+    with timed("plotly_chart", chart="pyramid", year=year):
+        st.plotly_chart(fig)
+
+    st.markdown(
+        f"""<p style='text-align:center;'><a href="{country.source_url(year)}" target="_blank">View Data Source From {year}</a></p>""",
+        unsafe_allow_html=True,
+    )
+
+
+def growth_section(country, df1, version=None):
+    st.markdown(
+        f"<h4>{country.name}’s Annual Population Growth Line Graph</h4>",
+        unsafe_allow_html=True,
+    )
+    fig1 = cached_growth(country, df1, version)
+    with timed("plotly_chart", chart="growth"):
+        st.plotly_chart(fig1)
+
+
+def indicators_section(country, index):
+    st.markdown(
+        f"<h4>{country.name}’s Demographic Indicators Line Graph</h4>",
+        unsafe_allow_html=True,
+    )
+    indicators = load_indicators(country, index)
+    fig = cached_indicators(country, index, indicators.summary)
+    with timed("plotly_chart", chart="indicators"):
+        st.plotly_chart(fig)
+
+    st.markdown(
+        "<p>Dependency ratios count the people aged 0–14 (youth), 65 and over "
+        "(old-age) or both (total) per 100 people aged 15–64. The median age, on "
+        "the right axis, is interpolated within its five-year age group.</p>",
+        unsafe_allow_html=True,
+    )
+    return indicators
+
+
+@st.fragment
+def data_section(page, heading, df, export_name):
+    with page_run(page, "data_section"):
+        st.markdown(
+            f"<h4>{heading}</h4>",
+            unsafe_allow_html=True,
+        )
+
+        filtered_df = explore(df, export_name)
+        export_buttons(filtered_df, export_name)
+
+
+def explore(df, table):
+    """``dataframe_explorer`` and the filtered table, both timed."""
+    # Imported on first use: streamlit_extras is slow to import.
+    from streamlit_extras.dataframe_explorer import dataframe_explorer
+
+    with timed("dataframe_explorer", table=table):
+        filtered_df = dataframe_explorer(df)
+    with timed("dataframe", table=table, rows=len(filtered_df)):
+        st.dataframe(filtered_df, use_container_width=True)
+    return filtered_df
+
+
+def export_buttons(filtered_df, export_name):
+    """Download of the filtered view, only generated once it is asked for.
+
+    The export is generated for the format and view that PREPARE DOWNLOAD was
+    clicked on; changing either shows the button again.
+    """
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        pass
+
+    with col2:
+        extension = st.radio(
+            "Download format",
+            list(EXPORT_FORMATS),
+            format_func=lambda ext: EXPORT_FORMATS[ext][0],
+            horizontal=True,
+            label_visibility="collapsed",
+            key=f"{export_name}-export-format",
+        )
+        _, mime, _ = EXPORT_FORMATS[extension]
+
+        # The prepared view: another format or filter asks to prepare again.
+        prepared = f"{export_name}-export-prepared"
+        view = (extension, frame_digest(filtered_df))
+        slot = st.empty()
+        if st.session_state.get(prepared) == view or slot.button(
+            "PREPARE DOWNLOAD", key=f"{export_name}-export-prepare"
+        ):
+            st.session_state[prepared] = view
+            slot.download_button(
+                label="DOWNLOAD DATAFRAME",
+                data=export(filtered_df, export_name, extension),
+                file_name=f"{export_name}.{extension}",
+                mime=mime,
+            )
+
+    with col3:
+        pass
+
+
+def render_country_page(key):
+    country = COUNTRIES[key]
+    with page_run(country.page):
+        country_page(country)
+    debug_panel()
+
+
+def country_page(country):
+    """The page of a featured country.
+
+    The pyramids and indicators read the shared cube when it is current. The
+    data tables and growth series still come from the loaded dataset, which
+    each server process holds privately: ``st.dataframe``, the explorer and
+    the exports all need a DataFrame, not array views.
+    """
+    set_favicon(f"{country.name} · PanPop")
+
+    df = load_dataset(country.pyramid_dataset)
+    df1 = load_growth(country)
+
+    local_css("style/style.css")
+
+    st.markdown(
+        f"<h1 style='text-align: center;'>{country.title}</h1>",
+        unsafe_allow_html=True,
+    )
+
+    add_vertical_space(1)
+
+    country_sections(country, load_pyramid_index(country.pyramid_dataset), df, df1)
+
+
+def country_sections(country, index, df, df1, growth_version=None):
+    """The pyramid, growth and indicator charts and the data tables of ``country``."""
+    first, last = index.span
+
+    pyramid_section(country, index)
+
+    add_vertical_space(1)
+    st.write("---")
+    add_vertical_space(1)
+
+    growth_section(country, df1, growth_version)
+
+    st.write("---")
+    add_vertical_space(1)
+
+    indicators = indicators_section(country, index)
+
+    st.write("---")
+    add_vertical_space(1)
+
+    data_section(
+        country.page,
+        f"{country.name}’s Population Pyramid Data ({first} – {last})",
+        df,
+        f"{country.key}-Pyramid-{first}-{last}",
+    )
+
+    add_vertical_space(1)
+    st.write("---")
+    add_vertical_space(1)
+
+    data_section(
+        country.page,
+        f"{country.name}’s Annual Population Growth Data ({first} – {last})",
+        df1,
+        f"{country.key}-Growth-{first}-{last}",
+    )
+
+    add_vertical_space(1)
+    st.write("---")
+    add_vertical_space(1)
+
+    data_section(
+        country.page,
+        f"{country.name}’s Demographic Indicators Data ({first} – {last})",
+        indicators.table(),
+        f"{country.key}-Indicators-{first}-{last}",
+    )
+
+
+CATALOGUE_KEY = "catalogue-country"
+
+
+def render_catalogue_page():
+    with page_run(CATALOGUE_PAGE):
+        catalogue_page()
+    debug_panel()
+
+
+def catalogue_page():
+    set_favicon("All Countries · PanPop")
+    local_css("style/style.css")
+
+    countries = catalogue.countries()
+    if not countries:
+        st.info(
+            "No countries have been ingested yet. Ingest a long-format population "
+            "file with `python -m panpop.ingest <file.csv>`."
+        )
+        return
+
+    # Sorted by name; ?country=<key> links to a country. The selection lives in
+    # session state, since a changing ``index`` would recreate the widget.
+    keys = sorted(countries, key=lambda key: countries[key]["name"])
+    if st.session_state.get(CATALOGUE_KEY) not in keys:
+        selected = st.query_params.get("country")
+        st.session_state[CATALOGUE_KEY] = selected if selected in keys else keys[0]
+    key = st.selectbox(
+        "Select a country or region.",
+        keys,
+        format_func=lambda key: countries[key]["name"],
+        key=CATALOGUE_KEY,
+    )
+    st.query_params["country"] = key
+
+    partition = catalogue.load_partition(key)
+    country = partition.country
+
+    st.markdown(
+        f"<h1 style='text-align: center;'>{country.title}</h1>",
+        unsafe_allow_html=True,
+    )
+
+    add_vertical_space(1)
+
+    country_sections(country, partition.index, partition.frame, partition.growth, partition.version)
@@ -0,0 +1,83 @@
+"""On-demand cProfile capture of page reruns.
+
+``profile`` wraps one script run in ``cProfile`` when enabled, and otherwise
+does nothing. Each capture is saved under ``PROFILE_DIR`` as
+``<page>-<trigger>-<timestamp>-<pid>-<n>.pstats``, for ``python -m pstats``
+or snakeviz, next to a ``.txt`` summary of the ``TOP_N`` functions by
+cumulative time. The trigger is the section that reran: ``rerun`` for the
+whole page, or the name of the fragment.
+
+Set ``PANPOP_PROFILE=1`` to profile every rerun, or add ``?profile=1`` to a
+page URL to profile only that session.
+"""
+
+import contextlib
+import cProfile
+import io
+import itertools
+import os
+import pstats
+import threading
+import time
+from pathlib import Path
+
+PROFILE_DIR = Path(os.environ.get("PANPOP_PROFILE_DIR", "profiles"))
+TOP_N = 25
+
+_local = threading.local()
+_captures = itertools.count()
+
+
+def env_enabled():
+    return os.environ.get("PANPOP_PROFILE") == "1"
+
+
+def summarize(profiler, top=TOP_N):
+    """The ``top`` functions of ``profiler`` by cumulative time."""
+    functions = pstats.Stats(profiler).stats
+    rows = sorted(functions.items(), key=lambda item: -item[1][3])[:top]
+    return [
+        {
+            "function": f"{Path(file_name).name}:{line}({name})",
+            "ncalls": str(calls) if calls == primitive else f"{calls}/{primitive}",
+            "tottime_ms": round(tottime * 1e3, 2),
+            "cumtime_ms": round(cumtime * 1e3, 2),
+        }
+        for (file_name, line, name), (primitive, calls, tottime, cumtime, _) in rows
+    ]
+
+
+def save(profiler, page, trigger, top=TOP_N):
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    stem = f"{page}-{trigger}-{stamp}-{os.getpid()}-{next(_captures)}"
+    path = PROFILE_DIR / f"{stem}.pstats"
+    profiler.dump_stats(path)
+
+    text = io.StringIO()
+    pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(top)
+    path.with_suffix(".txt").write_text(text.getvalue())
+    return {"page": page, "trigger": trigger, "pstats": str(path), "top": summarize(profiler, top)}
+
+
+@contextlib.contextmanager
+def profile(page, trigger, enabled=True, top=TOP_N):
+    """Profile the block if ``enabled``, yielding a dict filled with the capture.
+
+    Only the outermost block on a thread is profiled, so a fragment inside a
+    full rerun is part of the page's profile rather than its own.
+    """
+    if not enabled or getattr(_local, "active", False):
+        yield None
+        return
+
+    capture = {}
+    profiler = cProfile.Profile()
+    _local.active = True
+    profiler.enable()
+    try:
+        yield capture
+    finally:
+        profiler.disable()
+        _local.active = False
+        capture.update(save(profiler, page, trigger, top))
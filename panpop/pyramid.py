@@ -0,0 +1,87 @@
+"""Per-year lookup of population pyramid data.
+
+A pyramid dataset holds one row per (year, age group). ``PyramidIndex``
+exposes it as year-by-age-group NumPy arrays so a year's pyramid is a
+dictionary lookup returning row views, rather than a boolean mask and copy of
+the whole frame. The arrays are views into the shared population cube when it
+is current, and are otherwise reshaped once from the loaded dataset; either
+way ``load_pyramid_index`` builds the index once and keeps it in
+``data_cache``. Its ``version`` identifies the data, for keying the figures
+built from it.
+"""
+
+import numpy as np
+
+from panpop.cache import data_cache
+from panpop.cube import LABELS_PATH, load_cube
+from panpop.data import cache_tag, dataset_version, load_dataset, source_path
+
+
+class PyramidIndex:
+    def __init__(self, years, ages, male, female, version=None):
+        self.years = years
+        self.ages = ages
+        self.male = male
+        self.female = female
+        self.version = version
+        self._rows = {int(year): row for row, year in enumerate(years)}
+
+    @classmethod
+    def from_frame(cls, df, version=None):
+        years, codes = np.unique(df["Year"].to_numpy(), return_inverse=True)
+        n_years = len(years)
+        n_ages, remainder = divmod(len(df), n_years)
+        if remainder:
+            raise ValueError("Every year must have the same number of age groups")
+
+        order = np.argsort(codes, kind="stable")
+        ages = df["Age Group"].to_numpy()[order].reshape(n_years, n_ages)
+        if not (ages == ages[0]).all():
+            raise ValueError("Every year must list the same age groups in order")
+
+        return cls(
+            years,
+            ages[0],
+            df["Male Population"].to_numpy()[order].reshape(n_years, n_ages),
+            df["Female Population"].to_numpy()[order].reshape(n_years, n_ages),
+            version,
+        )
+
+    @classmethod
+    def from_cube(cls, cube, name):
+        return cls(
+            cube.years,
+            cube.ages,
+            cube.sel(name, sex="male"),
+            cube.sel(name, sex="female"),
+            cube.digests[name],
+        )
+
+    @property
+    def span(self):
+        """``(first, last)`` year."""
+        return int(self.years[0]), int(self.years[-1])
+
+    def __contains__(self, year):
+        return year in self._rows
+
+    def year(self, year):
+        """Return ``(ages, male, female)`` for ``year`` as array views."""
+        row = self._rows[year]
+        return self.ages, self.male[row], self.female[row]
+
+
+def load_pyramid_index(name):
+    cube = load_cube()
+    if cube is not None and cube.is_current(name):
+        # Kept until the cube is rebuilt, which rewrites its labels.
+        return data_cache.get(
+            LABELS_PATH,
+            lambda: PyramidIndex.from_cube(load_cube(), name),
+            tag=f"pyramid-index {name}",
+        )
+    return data_cache.get(
+        source_path(name),
+        lambda: PyramidIndex.from_frame(load_dataset(name), dataset_version(name)),
+        tag=cache_tag(name, "pyramid-index"),
+    )
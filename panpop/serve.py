@@ -0,0 +1,37 @@
+"""Start the Streamlit server with the caches warming up in the background.
+
+Run from the repository root instead of ``streamlit run HOME.py``; any other
+arguments are passed on to ``streamlit run``::
+
+    python -m panpop.serve [--warmup-workers N] [--no-warmup] [streamlit options]
+
+Set ``PANPOP_METRICS_PORT`` to expose ``/ready`` for readiness probes (see
+``panpop.metrics``).
+"""
+
+import argparse
+import logging
+
+from panpop.warmup import warmup
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--warmup-workers", type=int, default=None)
+    parser.add_argument("--no-warmup", action="store_true")
+    args, streamlit_args = parser.parse_known_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    # The app's own loggers only; Streamlit configures its own.
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("panpop.warmup").setLevel(logging.INFO)
+    if not args.no_warmup:
+        warmup.start(args.warmup_workers)
+
+    from streamlit.web import cli
+
+    cli.main(["run", "HOME.py", *streamlit_args], prog_name="streamlit")
+
+
+if __name__ == "__main__":
+    main()
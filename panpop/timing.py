@@ -0,0 +1,91 @@
+"""Per-section timings of page reruns.
+
+Wrap a hot path in ``timed`` -- as a ``with`` block or a decorator -- to record
+how long it took::
+
+    with timed("dataframe_explorer", table=export_name):
+        filtered_df = dataframe_explorer(df)
+
+Inside ``rerun`` the records are collected for the current script run, which
+Streamlit executes on its own thread, and ``records()`` returns them for the
+debug panel. Every record is also written as one JSON line to the
+``panpop.timing`` logger when it is enabled; setting ``PANPOP_TIMING_LOG`` to a
+file path does that at import, so the timings of all sessions can be
+aggregated with ``benchmarks/summarize_timings.py``. Functions appended to
+``observers`` are called with every record, as ``panpop.metrics`` does. With
+none of these in use a section costs two ``perf_counter`` calls.
+"""
+
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger("panpop.timing")
+
+_local = threading.local()
+observers = []
+
+
+def log_to(path):
+    """Append every timing record to ``path`` as a JSON line."""
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+if os.environ.get("PANPOP_TIMING_LOG"):
+    log_to(os.environ["PANPOP_TIMING_LOG"])
+
+
+@contextlib.contextmanager
+def timed(section, **fields):
+    """Record the duration of ``section``; ``fields`` are added to the record."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        record = {
+            "page": getattr(_local, "page", None),
+            "session": getattr(_local, "session", None),
+            "section": section,
+            "ms": round(elapsed * 1e3, 3),
+            **fields,
+        }
+        collected = getattr(_local, "records", None)
+        if collected is not None:
+            collected.append(record)
+        for observer in observers:
+            observer(record)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({"time": time.time(), **record}, default=str))
+
+
+@contextlib.contextmanager
+def rerun(page, section="rerun", session=None):
+    """Collect the sections timed while ``page`` runs on this thread.
+
+    Fragments wrap their body in ``rerun`` too: run on their own they start a
+    new collection, and during a full rerun they are timed as ``section``.
+    """
+    outermost = getattr(_local, "page", None) is None
+    if outermost:
+        _local.page = page
+        _local.session = session
+        _local.records = []
+    try:
+        with timed(section):
+            yield
+    finally:
+        if outermost:
+            _local.page = None
+
+
+def records():
+    """Records of the current script run, in the order their sections ended."""
+    return list(getattr(_local, "records", None) or [])
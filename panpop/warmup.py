@@ -0,0 +1,153 @@
+"""Background warm-up of the process-wide caches.
+
+``warmup.start()`` loads every pyramid dataset, derives the growth series
+and the comparison table from them, and builds the figures most visitors see
+first -- each country's pyramid for 1950 (the slider's default) and 2020, its
+growth chart and its indicators chart -- in a thread pool, so the first
+visitor to a page after a deploy is served from the caches. ``python -m
+panpop.serve`` starts it before the Streamlit server.
+
+Progress is logged to ``panpop.warmup`` and reported by ``warmup.status()``
+and the ``panpop_warmup_*`` metrics; the metrics endpoint answers ``/ready``
+with 200 only once the warm-up has finished, for readiness probes.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+
+from panpop import metrics
+from panpop.countries import COUNTRIES
+from panpop.data import load_dataset
+from panpop.figures import cached_growth, cached_indicators, cached_pyramid
+from panpop.growth import load_comparison, load_growth
+from panpop.indicators import load_indicators
+from panpop.pyramid import load_pyramid_index
+
+WARM_YEARS = [1950, 2020]
+
+logger = logging.getLogger("panpop.warmup")
+
+
+def warm_pyramid(country, year):
+    return cached_pyramid(country, load_pyramid_index(country.pyramid_dataset), year)
+
+
+def warm_growth(country):
+    return cached_growth(country, load_growth(country))
+
+
+def warm_indicators(country):
+    index = load_pyramid_index(country.pyramid_dataset)
+    return cached_indicators(country, index, load_indicators(country, index).summary)
+
+
+def tasks():
+    """``(label, callable)`` for everything the warm-up loads or builds."""
+    # The growth workbooks are not loaded: the pages derive growth from the pyramids.
+    for country in COUNTRIES.values():
+        yield f"dataset {country.pyramid_dataset}", partial(load_dataset, country.pyramid_dataset)
+    yield "comparison", load_comparison
+    for country in COUNTRIES.values():
+        for year in WARM_YEARS:
+            yield f"{country.key} pyramid {year}", partial(warm_pyramid, country, year)
+        yield f"{country.key} growth", partial(warm_growth, country)
+        yield f"{country.key} indicators", partial(warm_indicators, country)
+
+
+class WarmUp:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.started = None
+        self.elapsed = None
+
+    @property
+    def ready(self):
+        return self.elapsed is not None
+
+    def start(self, max_workers=None):
+        """Run the warm-up in the background; later calls are no-ops."""
+        with self._lock:
+            if self._thread is not None:
+                return self
+            metrics.readiness_checks.append(lambda: self.ready)
+            self._thread = threading.Thread(
+                target=self.run, args=(max_workers,), name="panpop-warmup", daemon=True
+            )
+        self._thread.start()
+        return self
+
+    def run(self, max_workers=None):
+        todo = list(tasks())
+        self.total = len(todo)
+        self.started = time.perf_counter()
+        logger.info("warm-up: %d tasks", self.total)
+        with ThreadPoolExecutor(max_workers, thread_name_prefix="panpop-warmup") as pool:
+            futures = {pool.submit(self.timed, work): label for label, work in todo}
+            for future in as_completed(futures):
+                label = futures[future]
+                try:
+                    elapsed = future.result()
+                except Exception:
+                    self.failed += 1
+                    logger.exception("warm-up: %s failed", label)
+                    continue
+                self.done += 1
+                logger.info(
+                    "warm-up %d/%d: %s (%.0f ms)",
+                    self.done + self.failed,
+                    self.total,
+                    label,
+                    elapsed * 1e3,
+                )
+        self.elapsed = time.perf_counter() - self.started
+        logger.info("warm-up finished in %.2fs, %d failed", self.elapsed, self.failed)
+
+    @staticmethod
+    def timed(work):
+        start = time.perf_counter()
+        work()
+        return time.perf_counter() - start
+
+    def wait(self, timeout=None):
+        """Block until the warm-up has finished; return whether it has."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "total": self.total,
+            "done": self.done,
+            "failed": self.failed,
+            "elapsed_s": self.elapsed,
+        }
+
+
+warmup = WarmUp()
+
+metrics.registry.register(
+    metrics.CallbackMetric(
+        "panpop_warmup_tasks",
+        "Warm-up tasks by state.",
+        "gauge",
+        ["state"],
+        lambda: {(state,): warmup.status()[state] for state in ("total", "done", "failed")},
+    )
+)
+metrics.registry.register(
+    metrics.CallbackMetric(
+        "panpop_warmup_seconds",
+        "Duration of the finished warm-up; absent until it has finished.",
+        "gauge",
+        [],
+        lambda: {} if warmup.elapsed is None else {(): warmup.elapsed},
+    )
+)